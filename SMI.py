@@ -3,9 +3,10 @@
 import pandas as pd
 import numpy as np
 from finta import TA
-from sklearn.linear_model import LinearRegression
 import structlog
 
+from linreg import rolling_linreg
+
 
 class SMIHistogram():
     """docstring for smiHistogram"""
@@ -26,19 +27,9 @@ class SMIHistogram():
         dfTem['source'] = df['close'] - dfTem['aveHLS']
         dfTem = dfTem.fillna(0)
 
-        yAll = dfTem['source'].values.tolist()
-        x = np.array(list(range(1, kclength+1))).reshape((-1, 1))
-
-        SMH = []
-        for i in range(len(dfTem['close'])-1,kclength*2,-1):
-            y = np.array(yAll[i-kclength+1:i+1])
-            reg = LinearRegression(fit_intercept = True).fit(x, y)
-            SMH.append(reg.predict(x)[-1 ])
-
-        tmp = [0 for _ in range(len(yAll)-len(SMH))]
-        SMH = SMH + tmp
-
-        SMH.reverse()
+        # ta.linreg endpoint of every window; the first 2*kclength+1 values stay 0
+        SMH = rolling_linreg(dfTem['source'].to_numpy(), kclength)
+        SMH[:kclength*2 + 1] = 0
 
         return pd.Series(SMH, name="{0} period SMI".format(kclength))
 
@@ -70,15 +61,8 @@ class ADX():
         df = df.fillna(0)
         dfTmp = dfTmp.fillna(0)
 
-        for i in range(0, len(dfTmp['close'])):
-            if (dfTmp.loc[i,"up"] > dfTmp.loc[i,"down"]) & (dfTmp.loc[i,"up"] > 0):
-                dfTmp.loc[i, 'plus'] = dfTmp.loc[i, 'up']
-            else:
-                dfTmp.loc[i, 'plus'] = 0
-            if (dfTmp.loc[i,"down"] > dfTmp.loc[i,"up"]) & (dfTmp.loc[i,"down"] > 0):
-                dfTmp.loc[i, 'minus'] = dfTmp.loc[i, 'down']
-            else:
-                dfTmp.loc[i, 'minus'] = 0
+        dfTmp['plus'] = np.where((dfTmp['up'] > dfTmp['down']) & (dfTmp['up'] > 0), dfTmp['up'], 0.0)
+        dfTmp['minus'] = np.where((dfTmp['down'] > dfTmp['up']) & (dfTmp['down'] > 0), dfTmp['down'], 0.0)
 
         dfTmp['plus'] = dfTmp['plus'].fillna(0)
         dfTmp['minus'] = dfTmp['minus'].fillna(0)
@@ -91,11 +75,7 @@ class ADX():
 
         dfTmp['sum'] = dfTmp['minus'] + dfTmp['plus']
 
-        for i in range(0, len(dfTmp['sum'])):
-          if float(dfTmp.loc[i,'sum']) == 0:
-              dfTmp.loc[i,'tmp'] = abs(dfTmp.loc[i,'plus'] - dfTmp.loc[i,'minus']) / 1
-          else:
-              dfTmp.loc[i,'tmp'] = abs(dfTmp.loc[i,'plus'] - dfTmp.loc[i,'minus']) / dfTmp.loc[i,'sum']
+        dfTmp['tmp'] = (dfTmp['plus'] - dfTmp['minus']).abs() / dfTmp['sum'].where(dfTmp['sum'] != 0, 1)
 
         dfTmp['ADX'] =100 * TA.SMMA(dfTmp, period=adxlen, column='tmp', adjust=True)
 
@@ -0,0 +1,151 @@
+"""
+Archive Importer - Bulk load of Binance public kline archives
+
+Binance publishes every symbol/interval as zipped CSV files
+(https://data.binance.vision), monthly (BTCUSDT-1m-2024-01.zip) and daily
+(BTCUSDT-1m-2024-02-03.zip). This module takes a directory of already
+downloaded archives, stream-decompresses each one straight into the pandas C
+CSV parser and returns the same typed frame as binanceExc.parse_klines, so
+years of 1m history load at disk speed. Only the gap after the last archived
+candle is then fetched over REST.
+
+    importer = KlineArchiveImporter('data/archives')
+    df = importer.load_and_top_up(Binance(), 'BTCUSDT', '1m')
+"""
+
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from binanceExc import KLINE_COLUMNS, KLINE_EXTENDED_COLUMNS, parse_klines
+
+
+ARCHIVE_PATTERN = re.compile(r'^(?P<symbol>[A-Z0-9]+)-(?P<interval>\d+[smhdwM])-(?P<period>\d{4}-\d{2}(?:-\d{2})?)\.zip$')
+
+# Column order of the archive CSVs (same as the REST klines rows)
+ARCHIVE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+                   'quote_volume', 'trades', 'taker_buy_volume', 'taker_buy_quote_volume', 'ignore']
+
+ARCHIVE_DTYPES = {
+    'time': np.int64, 'close_time': np.int64, 'trades': np.int64,
+    'open': np.float64, 'high': np.float64, 'low': np.float64, 'close': np.float64, 'volume': np.float64,
+    'quote_volume': np.float64, 'taker_buy_volume': np.float64, 'taker_buy_quote_volume': np.float64,
+}
+
+# Spot archives switched to microsecond timestamps in 2025
+MICROSECOND_THRESHOLD = 10 ** 14
+
+
+class KlineArchiveImporter:
+    """Loads monthly/daily kline zip archives from a directory"""
+    
+    def __init__(self, directory, max_workers=4):
+        self.directory = directory
+        self.max_workers = max_workers
+        self.logger = structlog.get_logger(__name__)
+    
+    def files(self, symbol, interval, start=None, end=None):
+        """
+        Archive paths of one symbol/interval, monthly before daily, oldest
+        first. start/end (ms) skip the files whose month or day holds no open
+        time in the range, judged from the file name alone.
+        """
+        matches = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                match = ARCHIVE_PATTERN.match(name)
+                if match and match['symbol'] == symbol and match['interval'] == interval:
+                    period_start, period_end = self._period_range(match['period'])
+                    if (start is None or period_end > start) and (end is None or period_start <= end):
+                        matches.append((match['period'], os.path.join(root, name)))
+        return [path for _, path in sorted(matches)]
+    
+    def read_archive(self, path, extended=False):
+        """Parse one archive without extracting it to disk"""
+        columns = KLINE_COLUMNS + (KLINE_EXTENDED_COLUMNS if extended else [])
+        
+        with zipfile.ZipFile(path) as archive:
+            name = next(n for n in archive.namelist() if n.endswith('.csv'))
+            with archive.open(name) as f:
+                first = f.readline()
+                has_header = not first[:1].isdigit()
+            with archive.open(name) as f:
+                df = pd.read_csv(
+                    f,
+                    header=None,
+                    names=ARCHIVE_COLUMNS,
+                    usecols=columns,
+                    dtype={col: ARCHIVE_DTYPES[col] for col in columns},
+                    skiprows=1 if has_header else 0,
+                    engine='c',
+                )
+        
+        for col in ('time', 'close_time'):
+            values = df[col].to_numpy()
+            if len(values) and values[0] >= MICROSECOND_THRESHOLD:
+                df[col] = values // 1000
+        
+        return df[columns]
+    
+    def load(self, symbol, interval, start=None, end=None, extended=False):
+        """
+        All archived candles of one symbol/interval, sorted by open time and
+        without the overlaps between monthly and daily files. start/end (ms)
+        restrict the open times; only the archives covering them are read.
+        """
+        paths = self.files(symbol, interval, start, end)
+        if not paths:
+            self.logger.info(f'No archives for {symbol} {interval} in {self.directory}')
+            return parse_klines([], extended)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            frames = list(pool.map(lambda path: self.read_archive(path, extended), paths))
+        
+        df = pd.concat(frames, ignore_index=True)
+        if not df['time'].is_monotonic_increasing or not df['time'].is_unique:
+            df = df.drop_duplicates(subset='time').sort_values('time', ignore_index=True)
+        
+        if start is not None:
+            df = df[df['time'] >= start]
+        if end is not None:
+            df = df[df['time'] <= end]
+        
+        df = df.reset_index(drop=True)
+        df['date'] = df['time'].to_numpy().astype('datetime64[ms]')
+        
+        self.logger.info(f'Loaded {len(df)} {symbol} {interval} candles from {len(paths)} archives')
+        return df
+    
+    def load_and_top_up(self, exchange, symbol, interval, start=None, end=None, extended=False):
+        """
+        Archived candles plus the trailing gap up to end (default: now)
+        downloaded with exchange.GetSymbolKlinesRange.
+        """
+        df = self.load(symbol, interval, start, end, extended)
+        
+        if len(df):
+            gap_start = int(df['time'].iloc[-1]) + 1
+        elif start is not None:
+            gap_start = start
+        else:
+            self.logger.warning(f'No archives and no start for {symbol} {interval}, downloading the last candles only')
+            return exchange.GetSymbolKlines(symbol, interval, extended=extended)
+        
+        recent = exchange.GetSymbolKlinesRange(symbol, interval, gap_start, end, extended)
+        self.logger.info(f'Topped up {len(recent)} {symbol} {interval} candles over REST')
+        
+        if len(recent) == 0:
+            return df
+        return pd.concat([df, recent[df.columns]], ignore_index=True)
+    
+    @staticmethod
+    def _period_range(period):
+        """[start, end) in ms of an archive period ('YYYY-MM' or 'YYYY-MM-DD')"""
+        first = pd.Timestamp(period)
+        following = first + (pd.DateOffset(days=1) if len(period) > 7 else pd.DateOffset(months=1))
+        return first.value // 10**6, following.value // 10**6
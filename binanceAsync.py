@@ -0,0 +1,288 @@
+import asyncio
+import json
+import time
+
+import aiohttp
+import pandas as pd
+import structlog
+
+from binanceExc import (ENDPOINTS, Binance, ExchangeInfoCache, WeightGovernor, endpoint_name, get_governor,
+                        get_exchange_info_cache, get_stats, parse_klines, request_weight)
+from request_stats import RequestStats
+
+
+class AsyncBinance:
+    '''
+        asyncio version of binanceExc.Binance.
+
+        Returns the same data shapes as the sync client (dicts for the JSON
+        endpoints, DataFrames for klines). One aiohttp session with a pooled
+        connector is shared by every coroutine using the client, and requests
+        draw from the same WeightGovernor and ExchangeInfoCache as the sync
+        clients of the process.
+
+            async with AsyncBinance() as exchange:
+                prices = await asyncio.gather(*[exchange.GetPrice(s) for s in symbols])
+    '''
+
+    KLINE_INTERVALS = Binance.KLINE_INTERVALS
+    INTERVAL_MS = Binance.INTERVAL_MS
+    ENDPOINT_WEIGHTS = Binance.ENDPOINT_WEIGHTS
+
+    PlanKlineWindows = Binance.PlanKlineWindows
+    IntervalStart = Binance.IntervalStart
+
+    def __init__(self, base:str=None, pool_size:int=100, timeout:float=10, governor:WeightGovernor=None,
+                 max_retries:int=5, exchange_info:ExchangeInfoCache=None, stats:RequestStats=None):
+        '''
+            base:        REST root URL. Defaults to https://api.binance.com.
+            pool_size:   maximum number of simultaneous connections.
+            timeout:     total timeout in seconds of every request.
+            governor:    WeightGovernor to throttle with. Defaults to the shared one.
+            max_retries: how many times a 429/418 answer is retried.
+            exchange_info: ExchangeInfoCache for symbol metadata. Defaults to the
+                         shared one.
+            stats:       RequestStats to record into. Defaults to the shared one.
+        '''
+        self.logger = structlog.get_logger(__name__)
+
+        self.base = base or 'https://api.binance.com'
+        self.endpoints = dict(ENDPOINTS)
+        self.headers = {}
+
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.governor = governor or get_governor()
+        self.max_retries = max_retries
+        self.exchange_info = exchange_info or get_exchange_info_cache()
+        self.stats = stats or get_stats()
+
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                                  headers={'Accept-Encoding': 'gzip, deflate'})
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def get(self, url, params=None, headers=None) -> dict:
+        """ Makes a Get Request """
+
+        try:
+            self.logger.info(f'GET {url}')
+            status, text = await self._request(url, params=params, headers=headers)
+            started = time.perf_counter()
+            data = json.loads(text)
+            self.stats.record_parse(endpoint_name(url, self.endpoints), time.perf_counter() - started)
+            if isinstance(data, dict):
+                data['url'] = url
+        except Exception as e:
+            self.logger.warning("GET method")
+            self.logger.warning(f"Exception occurred when trying to access {url}")
+            self.logger.warning(e)
+            data = {'code': '-1', 'url':url, 'msg': e}
+
+        return data
+
+    async def _request(self, url, params=None, headers=None):
+        '''
+            Sends a GET within the shared weight budget and returns (status, body).
+            429/418 answers are retried after the governor's back-off.
+        '''
+
+        weight = request_weight(url, params, self.endpoints)
+        endpoint = endpoint_name(url, self.endpoints)
+
+        for attempt in range(self.max_retries + 1):
+            wait = self.governor.reserve(weight)
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self.governor.reserve(weight)
+
+            started = time.perf_counter()
+            try:
+                async with self.session.get(url, params=params, headers=headers) as response:
+                    body = await response.read()
+                    text = body.decode(response.get_encoding())
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.stats.record_error(endpoint, time.perf_counter() - started)
+                raise
+
+            self.stats.record(endpoint, time.perf_counter() - started, len(body),
+                              response.status, response.headers.get('X-MBX-USED-WEIGHT-1m'))
+            self.governor.update(response.headers)
+
+            if response.status not in (429, 418) or attempt == self.max_retries:
+                return response.status, text
+
+            # Only pause the shared governor when another attempt will follow
+            delay = self.governor.backoff(response.status, response.headers.get('Retry-After'), attempt)
+
+            self.stats.record_retry(endpoint)
+            await asyncio.sleep(delay)
+
+   #General
+    async def GET_server_time(self):
+
+        url = self.base + self.endpoints['serverTime']
+        return await self.get(url, headers=self.headers)
+
+    async def GetAvPrice(self, symbol:str):
+
+        url = self.base + self.endpoints['averagePrice']
+        return await self.get(url, params={'symbol': symbol}, headers=self.headers)
+
+    async def GetPrice(self, symbol:str):
+
+        url = self.base + self.endpoints['price']
+        return await self.get(url, params={'symbol': symbol}, headers=self.headers)
+
+    async def Get24hrTicker(self, symbol:str):
+
+        url = self.base + self.endpoints['24hrTicker']
+        return await self.get(url, params={'symbol': symbol}, headers=self.headers)
+
+    async def GetOrderBook(self, symbol:str, limit:int=100):
+
+        params = {'symbol': symbol}
+        if limit != 100:
+            params['limit'] = limit
+
+        url = self.base + self.endpoints["orderBook"]
+        return await self.get(url, params=params, headers=self.headers)
+
+    async def GETBestPQOrderBook(self, symbol:str):
+
+        url = self.base + self.endpoints["bestPQOrderBook"]
+        return await self.get(url, params={'symbol': symbol}, headers=self.headers)
+
+   #Exchange info
+    async def GetExchangeInfo(self) -> dict:
+
+        url = self.base + self.endpoints["exchangeInfo"]
+        return await self.get(url)
+
+    async def GetSymbolIndex(self) -> dict:
+        '''
+            Returns the cached {symbol: metadata} index, downloading exchangeInfo
+            only when the shared cache has expired.
+        '''
+
+        data = await self.GetExchangeInfo() if self.exchange_info.expired else None
+
+        return self.exchange_info.index(lambda: data)
+
+    async def GetSymbolMetadata(self, symbol:str) -> dict:
+
+        return (await self.GetSymbolIndex())[symbol]
+
+    async def GetTradingSymbols(self, quoteAssets:list=None):
+
+        if quoteAssets == None:
+            return []
+
+        data = await self.GetExchangeInfo() if self.exchange_info.expired else None
+
+        symbols_list = []
+        for quote, symbols in self.exchange_info.trading_by_quote(lambda: data).items():
+            if quote in quoteAssets:
+                symbols_list.extend(symbols)
+
+        return symbols_list
+
+    async def GetSymbolDataOfSymbols(self, symbols:list=None):
+
+        if symbols == None:
+            return []
+
+        index = await self.GetSymbolIndex()
+
+        return [index[s]['raw'] for s in symbols if s in index and index[s]['status'] == 'TRADING']
+
+    async def GetLotFilte(self, symbol:str) -> dict:
+
+        return (await self.GetSymbolMetadata(symbol))['filters'].get('LOT_SIZE', {})
+
+    async def GetPriceFilter(self, symbol:str) -> dict:
+
+        return (await self.GetSymbolMetadata(symbol))['filters'].get('PRICE_FILTER', {})
+
+    async def GetMinNotional(self, symbol:str) -> dict:
+
+        return (await self.GetSymbolMetadata(symbol))['filters'].get('MIN_NOTIONAL', {})
+
+   #Klines
+    async def GetSymbolKlines(self, symbol:str, interval:str, limit:int=1000, init_time=False, end_time=False,
+                              extended:bool=False) -> pd.DataFrame:
+        '''
+            Same as Binance.GetSymbolKlines.
+        '''
+
+        if init_time and end_time and end_time > init_time:
+            return await self.GetSymbolKlinesRange(symbol, interval, init_time, end_time, extended)
+
+        if limit > 1000:
+            end = Binance._now_ms()
+            start = self.IntervalStart(interval, end, limit)
+            df = await self.GetSymbolKlinesRange(symbol, interval, start, end, extended)
+            return df.tail(limit).reset_index(drop=True)
+
+        params = {
+            'symbol'  : symbol,
+            'interval': interval,
+            'limit'   : limit,
+        }
+
+        return parse_klines(await self._get_klines(params), extended)
+
+    async def GetSymbolKlinesRange(self, symbol:str, interval:str, start, end=None, extended:bool=False) -> pd.DataFrame:
+        '''
+            Same as Binance.GetSymbolKlinesRange, but every planned window is
+            requested concurrently.
+        '''
+        start = Binance._to_ms(start)
+        end = Binance._now_ms() if end is None else Binance._to_ms(end)
+
+        windows = self.PlanKlineWindows(interval, start, end)
+        self.logger.info(f'GetSymbolKlinesRange {symbol} {interval}: {len(windows)} requests')
+
+        pages = await asyncio.gather(*[
+            self._get_klines({
+                'symbol'   : symbol,
+                'interval' : interval,
+                'startTime': window_start,
+                'endTime'  : window_end,
+                'limit'    : 1000,
+            })
+            for window_start, window_end in windows
+        ])
+
+        df = parse_klines([row for page in pages for row in page], extended)
+        df = df.drop_duplicates(subset='time').sort_values('time')
+
+        return df.reset_index(drop=True)
+
+    async def _get_klines(self, params:dict) -> list:
+
+        url = self.base + self.endpoints['klines']
+
+        status, text = await self._request(url, params=params, headers=self.headers)
+        data = json.loads(text)
+
+        if not isinstance(data, list):
+            self.logger.warning(f'Klines request failed {params}: {data}')
+            raise ValueError(f"Klines request failed for {params.get('symbol')} {params.get('interval')}: {data}")
+
+        return data
@@ -1,36 +1,557 @@
 from datetime import datetime
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import decimal
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
 import pandas as pd
 import structlog
 
+from request_stats import RequestStats
+
 request_delay = 1000
 
+ENDPOINTS = {
+  "serverTime"     : '/api/v3/time',
+  "klines"         : '/api/v3/klines',
+  "exchangeInfo"   : '/api/v3/exchangeInfo',
+  "24hrTicker"     : '/api/v3/ticker/24hr',
+  "averagePrice"   : '/api/v3/avgPrice',
+  "price"          : '/api/v3/ticker/price',
+  "orderBook"      : '/api/v3/depth',
+  "bestPQOrderBook": '/api/v3/ticker/bookTicker',
+  "aggTrades"      : '/api/v3/aggTrades',
+}
+
+# REQUEST_WEIGHT of every endpoint for a single symbol request
+ENDPOINT_WEIGHTS = {
+  "serverTime"     : 1,
+  "klines"         : 2,
+  "exchangeInfo"   : 20,
+  "24hrTicker"     : 2,
+  "averagePrice"   : 2,
+  "price"          : 2,
+  "orderBook"      : 5,
+  "bestPQOrderBook": 2,
+  "aggTrades"      : 4,
+}
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (3.05, 10)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size:int=DEFAULT_POOL_SIZE) -> requests.Session:
+    '''
+        Returns the process wide keep-alive session shared by every Binance client.
+
+        The session is created once with a connection pool of pool_size sockets
+        per host, so threads reuse warm TCP/TLS connections instead of paying a
+        new handshake per request. Later calls return the same session.
+    '''
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = new_session(pool_size)
+        return _session
+
+
+def new_session(pool_size:int=DEFAULT_POOL_SIZE) -> requests.Session:
+    '''
+        Builds a pooled keep-alive session. pool_block makes extra threads wait
+        for a free connection instead of opening throw-away sockets.
+    '''
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection'     : 'keep-alive',
+    })
+    return session
+
+
+def endpoint_name(url, endpoints=ENDPOINTS) -> str:
+    '''
+        Key of endpoints that url points to, or its path when unknown.
+    '''
+
+    path = urlsplit(url).path
+    return next((key for key, endpoint in endpoints.items() if endpoint == path), path)
+
+
+def request_weight(url, params=None, endpoints=ENDPOINTS) -> int:
+    '''
+        REQUEST_WEIGHT of a GET to url, following the Binance documentation
+        for the endpoints in endpoints. Unknown endpoints count as 1.
+    '''
+
+    parts = urlsplit(url)
+    params = dict(params or {})
+    for key, value in parse_qs(parts.query).items():
+        params.setdefault(key, value[0])
+
+    name = endpoint_name(url, endpoints)
+    if name not in ENDPOINT_WEIGHTS:
+        return 1
+
+    has_symbol = 'symbol' in params or 'symbols' in params
+    if name == 'orderBook':
+        limit = int(params.get('limit', 100))
+        if limit <= 100:
+            return 5
+        if limit <= 500:
+            return 25
+        if limit <= 1000:
+            return 50
+        return 250
+    if name == '24hrTicker' and 'symbols' in params:
+        count = len(json.loads(params['symbols']))
+        return 2 if count <= 20 else 40 if count <= 100 else 80
+    if name == '24hrTicker' and not has_symbol:
+        return 80
+    if name in ('price', 'bestPQOrderBook') and not has_symbol:
+        return 4
+
+    return ENDPOINT_WEIGHTS[name]
+
+
+class WeightGovernor:
+    '''
+        Shared REQUEST_WEIGHT budget for the Binance REST API.
+
+        Binance allows `limit` weight per minute per IP and bans the IP (429,
+        then 418) when it is exceeded. Every request reserves its weight here
+        before it is sent; once the reserved weight reaches `safety` * limit the
+        caller sleeps until the next minute window. The counter is corrected
+        from the X-MBX-USED-WEIGHT-1m header of every response, and a 429/418
+        pauses all threads for Retry-After seconds plus jitter.
+    '''
+
+    def __init__(self, limit:int=6000, safety:float=0.9, max_jitter:float=1.0):
+        self.limit = limit
+        self.safety = safety
+        self.max_jitter = max_jitter
+        self.logger = structlog.get_logger(__name__)
+
+        self._lock = threading.Lock()
+        self._window = self._current_window()
+        self._used = 0
+        self._paused_until = 0.0
+
+    def acquire(self, weight:int=1):
+        '''Blocks until `weight` fits in the current minute budget, then reserves it.'''
+
+        while True:
+            wait = self.reserve(weight)
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    def reserve(self, weight:int=1) -> float:
+        '''
+            Reserves `weight` if it fits in the budget and returns 0, otherwise
+            returns the seconds to wait before trying again. Lets async callers
+            share the budget without blocking the event loop.
+        '''
+
+        with self._lock:
+            now = time.time()
+            self._roll_window(now)
+
+            if now < self._paused_until:
+                wait = self._paused_until - now
+            elif self._used + weight > self.limit * self.safety and self._used > 0:
+                wait = self._window + 60 - now + random.uniform(0, self.max_jitter)
+            else:
+                self._used += weight
+                return 0
+
+            used = self._used
+
+        self.logger.info(f'Weight governor: used {used}/{self.limit}, waiting {wait:.2f}s')
+        return wait
+
+    def update(self, headers):
+        '''Syncs the local counter with the used weight reported by Binance.'''
+
+        used = headers.get('X-MBX-USED-WEIGHT-1m') if headers else None
+        if used is None:
+            return
+
+        with self._lock:
+            self._roll_window(time.time())
+            self._used = max(self._used, int(used))
+
+    def backoff(self, status:int, retry_after=None, attempt:int=0) -> float:
+        '''
+            Pauses every caller after a 429/418. Uses Retry-After when Binance
+            sends it, otherwise an exponential delay. Returns the pause length.
+        '''
+
+        if retry_after is not None:
+            delay = float(retry_after)
+        else:
+            delay = min(2 ** attempt, 60)
+        delay += random.uniform(0, self.max_jitter)
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.time() + delay)
+
+        self.logger.warning(f'Binance answered {status}, backing off {delay:.2f}s')
+        return delay
+
+    @property
+    def used(self) -> int:
+        with self._lock:
+            self._roll_window(time.time())
+            return self._used
+
+    def _roll_window(self, now:float):
+        window = self._current_window(now)
+        if window != self._window:
+            self._window = window
+            self._used = 0
+
+    @staticmethod
+    def _current_window(now:float=None) -> float:
+        now = time.time() if now is None else now
+        return now - now % 60
+
+
+class ExchangeInfoCache:
+    '''
+        TTL cache of /api/v3/exchangeInfo with a by-symbol index.
+
+        The payload is downloaded at most once per `ttl` seconds (optionally
+        persisted to `snapshot_path` so it survives restarts) and indexed as
+        {symbol: {'symbol', 'status', 'baseAsset', 'quoteAsset', 'filters', 'raw'}},
+        where 'filters' maps filterType to the filter dict. Lookups after the
+        first download are plain dict operations.
+    '''
+
+    def __init__(self, ttl:float=3600, snapshot_path:str=None):
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.logger = structlog.get_logger(__name__)
+
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._symbols = {}
+        self._trading_by_quote = {}
+
+    def index(self, fetch) -> dict:
+        '''
+            Returns the symbol index, refreshing it with fetch() (a callable that
+            returns the raw exchangeInfo dict) when it is older than the TTL.
+        '''
+
+        with self._lock:
+            if time.time() - self._loaded_at > self.ttl:
+                self._refresh(fetch)
+            return self._symbols
+
+    def trading_by_quote(self, fetch) -> dict:
+        '''Returns {quoteAsset: [symbols currently TRADING]}.'''
+
+        with self._lock:
+            if time.time() - self._loaded_at > self.ttl:
+                self._refresh(fetch)
+            return self._trading_by_quote
+
+    @property
+    def expired(self) -> bool:
+        return time.time() - self._loaded_at > self.ttl
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _refresh(self, fetch):
+        data, loaded_at = self._read_snapshot()
+
+        if data is None:
+            data = fetch()
+            if not data or 'code' in data:
+                self.logger.warning(f"exchangeInfo download failed: {data.get('msg') if data else data}")
+                return
+            loaded_at = time.time()
+            self._write_snapshot(data)
+
+        symbols = {}
+        trading_by_quote = {}
+        for pair in data['symbols']:
+            symbols[pair['symbol']] = {
+                'symbol'    : pair['symbol'],
+                'status'    : pair['status'],
+                'baseAsset' : pair['baseAsset'],
+                'quoteAsset': pair['quoteAsset'],
+                'filters'   : {fil['filterType']: fil for fil in pair['filters']},
+                'raw'       : pair,
+            }
+            if pair['status'] == 'TRADING':
+                trading_by_quote.setdefault(pair['quoteAsset'], []).append(pair['symbol'])
+
+        self._symbols = symbols
+        self._trading_by_quote = trading_by_quote
+        self._loaded_at = loaded_at
+
+    def _read_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None, 0.0
+
+        modified = os.path.getmtime(self.snapshot_path)
+        if time.time() - modified > self.ttl:
+            return None, 0.0
+
+        with open(self.snapshot_path, 'r') as f:
+            return json.load(f), modified
+
+    def _write_snapshot(self, data):
+        if not self.snapshot_path:
+            return
+
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+
+KLINE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume', 'close_time']
+KLINE_EXTENDED_COLUMNS = ['quote_volume', 'trades', 'taker_buy_volume', 'taker_buy_quote_volume']
+
+
+def parse_klines(klines:list, extended:bool=False) -> pd.DataFrame:
+    '''
+        Parses raw /api/v3/klines rows into a typed frame in one pass.
+
+        The rows are loaded once into an object matrix and every column block is
+        converted straight to its NumPy dtype: int64 open/close times in ms and
+        float64 OHLCV. With extended=True the quote volume, trade count (int64)
+        and taker buy volumes are kept too. 'date' is a datetime64[ms] view of
+        the open time.
+    '''
+    columns = KLINE_COLUMNS + (KLINE_EXTENDED_COLUMNS if extended else [])
+
+    if not klines:
+        empty = {col: np.empty(0, dtype=np.float64) for col in columns}
+        empty['time'] = np.empty(0, dtype=np.int64)
+        empty['close_time'] = np.empty(0, dtype=np.int64)
+        if extended:
+            empty['trades'] = np.empty(0, dtype=np.int64)
+        empty['date'] = np.empty(0, dtype='datetime64[ms]')
+        return pd.DataFrame(empty)
+
+    rows = np.array(klines, dtype=object)
+
+    times = rows[:, [0, 6]].astype(np.int64)
+    ohlcv = rows[:, 1:6].astype(np.float64)
+
+    data = {
+        'time'      : times[:, 0],
+        'open'      : ohlcv[:, 0],
+        'high'      : ohlcv[:, 1],
+        'low'       : ohlcv[:, 2],
+        'close'     : ohlcv[:, 3],
+        'volume'    : ohlcv[:, 4],
+        'close_time': times[:, 1],
+    }
+
+    if extended:
+        volumes = rows[:, [7, 9, 10]].astype(np.float64)
+        data['quote_volume'] = volumes[:, 0]
+        data['trades'] = rows[:, 8].astype(np.int64)
+        data['taker_buy_volume'] = volumes[:, 1]
+        data['taker_buy_quote_volume'] = volumes[:, 2]
+
+    data['date'] = times[:, 0].astype('datetime64[ms]')
+
+    return pd.DataFrame(data, copy=False)
+
+
+class SnapshotCache:
+    '''
+        Short-TTL cache of market snapshots (prices, tickers, book tops) with
+        request coalescing.
+
+        A snapshot younger than `ttl` seconds is served from memory. While one
+        caller is fetching a key, every other caller asking for the same key
+        waits for that single request instead of sending its own. Failed
+        fetches (answers carrying 'code') are handed to the waiting callers but
+        not cached.
+    '''
+
+    def __init__(self, ttl:float=1.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+
+    def get(self, key, fetch):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] <= self.ttl:
+                return entry[1]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            data = fetch()
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if not (isinstance(data, dict) and 'code' in data):
+                self._entries[key] = (time.time(), data)
+            del self._inflight[key]
+        future.set_result(data)
+
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+
+AGG_TRADE_COLUMNS = ['agg_id', 'price', 'qty', 'first_id', 'last_id', 'time', 'is_buyer_maker']
+
+
+def parse_agg_trades(trades:list) -> pd.DataFrame:
+    '''
+        Parses raw /api/v3/aggTrades answers into typed columns: int64 ids and
+        ms times, float64 price and quantity, bool is_buyer_maker.
+    '''
+    n = len(trades)
+
+    return pd.DataFrame({
+        'agg_id'        : np.fromiter((t['a'] for t in trades), dtype=np.int64, count=n),
+        'price'         : np.array([t['p'] for t in trades], dtype=np.float64),
+        'qty'           : np.array([t['q'] for t in trades], dtype=np.float64),
+        'first_id'      : np.fromiter((t['f'] for t in trades), dtype=np.int64, count=n),
+        'last_id'       : np.fromiter((t['l'] for t in trades), dtype=np.int64, count=n),
+        'time'          : np.fromiter((t['T'] for t in trades), dtype=np.int64, count=n),
+        'is_buyer_maker': np.fromiter((t['m'] for t in trades), dtype=np.bool_, count=n),
+    }, copy=False)
+
+
+_governor = WeightGovernor()
+_exchange_info = ExchangeInfoCache()
+_snapshots = SnapshotCache()
+_stats = RequestStats()
+
+
+def get_governor() -> WeightGovernor:
+    '''Returns the weight governor shared by every Binance client of this process.'''
+    return _governor
+
+
+def get_exchange_info_cache() -> ExchangeInfoCache:
+    '''Returns the exchangeInfo cache shared by every Binance client of this process.'''
+    return _exchange_info
+
+
+def get_snapshot_cache() -> SnapshotCache:
+    '''Returns the market snapshot cache shared by every Binance client of this process.'''
+    return _snapshots
+
+
+def get_stats() -> RequestStats:
+    '''Returns the request statistics shared by every Binance client of this process.'''
+    return _stats
+
 
 
 class Binance:
 
     KLINE_INTERVALS = ['1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d', '3d', '1w', '1M']
 
-    def __init__(self, arg=None, filename=None):
+    # Candle length in ms for the fixed width intervals. '1M' follows the calendar.
+    INTERVAL_MS = {
+        '1m' : 60 * 1000,
+        '3m' : 3 * 60 * 1000,
+        '5m' : 5 * 60 * 1000,
+        '15m': 15 * 60 * 1000,
+        '30m': 30 * 60 * 1000,
+        '1h' : 60 * 60 * 1000,
+        '2h' : 2 * 60 * 60 * 1000,
+        '4h' : 4 * 60 * 60 * 1000,
+        '6h' : 6 * 60 * 60 * 1000,
+        '8h' : 8 * 60 * 60 * 1000,
+        '12h': 12 * 60 * 60 * 1000,
+        '1d' : 24 * 60 * 60 * 1000,
+        '3d' : 3 * 24 * 60 * 60 * 1000,
+        '1w' : 7 * 24 * 60 * 60 * 1000,
+    }
+
+    # Weekly candles open on Mondays; the epoch (1970-01-01) was a Thursday
+    WEEK_OFFSET_MS = 4 * 24 * 60 * 60 * 1000
+
+    ENDPOINT_WEIGHTS = ENDPOINT_WEIGHTS
+
+    def __init__(self, arg=None, filename=None, session=None, pool_size:int=None, timeout=DEFAULT_TIMEOUT,
+                 governor:WeightGovernor=None, max_retries:int=5, exchange_info:ExchangeInfoCache=None,
+                 base:str=None, cassette=None, snapshots:SnapshotCache=None, stats:RequestStats=None):
+        '''
+            session:     requests.Session to use. By default every client shares the
+                         module level pooled session (see get_session).
+            pool_size:   when given, a private session with this many pooled
+                         connections is created instead of the shared one.
+            timeout:     (connect, read) timeout in seconds applied to every request.
+            governor:    WeightGovernor to throttle with. Defaults to the shared one.
+            max_retries: how many times a 429/418 answer is retried.
+            exchange_info: ExchangeInfoCache for symbol metadata. Defaults to the
+                         shared one (1h TTL, no snapshot).
+            base:        REST root URL, e.g. a local stand-in server. Defaults to
+                         https://api.binance.com.
+            cassette:    cassette.Cassette to record responses to or replay them
+                         from instead of the network.
+            snapshots:   SnapshotCache for the bulk price/ticker calls. Defaults
+                         to the shared one (1s TTL).
+            stats:       RequestStats recording latency, bytes, parse time,
+                         retries and weight per endpoint. Defaults to the shared one.
+        '''
         super(Binance, self).__init__()
         self.arg = arg
         self.logger = structlog.get_logger(__name__)
 
-        self.base = 'https://api.binance.com'
+        if session is None:
+            session = new_session(pool_size) if pool_size else get_session()
+        self.session = session
+        self.timeout = timeout
+        self.governor = governor or get_governor()
+        self.max_retries = max_retries
+        self.exchange_info = exchange_info or get_exchange_info_cache()
+        self.cassette = cassette
+        self.snapshots = snapshots or get_snapshot_cache()
+        self.stats = stats or get_stats()
+
+        self.base = base or 'https://api.binance.com'
         self.test_base = 'https://testnet.binance.vision'
-        self.endpoints = {
-          "serverTime"     : '/api/v3/time',
-          "klines"         : '/api/v3/klines',
-          "exchangeInfo"   : '/api/v3/exchangeInfo',
-          "24hrTicker"     : '/api/v3/ticker/24hr',
-          "averagePrice"   : '/api/v3/avgPrice',
-          "price"          : '/api/v3/ticker/price',
-          "orderBook"      : '/api/v3/depth',
-          "bestPQOrderBook": '/api/v3/ticker/bookTicker',
-        }
+        self.endpoints = dict(ENDPOINTS)
         self.headers = {}
 
 
@@ -39,9 +560,12 @@ class Binance:
 
         try:
             self.logger.info(f'GET {url}')
-            response = requests.get(url, params=params, headers=headers)
+            response = self._request(url, params=params, headers=headers)
+            started = time.perf_counter()
             data = json.loads(response.text)
-            data['url'] = url
+            self.stats.record_parse(self.EndpointName(url), time.perf_counter() - started)
+            if isinstance(data, dict):
+                data['url'] = url
         except Exception as e:
             self.logger.warning("GET method")
             self.logger.warning(f"Exception occurred when trying to access {url}")
@@ -50,6 +574,61 @@ class Binance:
 
         return data
 
+    def _request(self, url, params=None, headers=None) -> requests.Response:
+        '''
+            Sends a GET through the shared session within the weight budget.
+            429/418 answers are retried after the governor's back-off; the last
+            response is returned when the retries run out.
+
+            With a cassette attached, responses are served from it (replay) or
+            stored in it (record).
+        '''
+
+        if self.cassette is not None and self.cassette.replaying:
+            return self.cassette.play(url, params)
+
+        weight = self.RequestWeight(url, params)
+        endpoint = self.EndpointName(url)
+
+        for attempt in range(self.max_retries + 1):
+            self.governor.acquire(weight)
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException:
+                self.stats.record_error(endpoint, time.perf_counter() - started)
+                raise
+            self.stats.record(endpoint, time.perf_counter() - started, len(response.content),
+                              response.status_code, response.headers.get('X-MBX-USED-WEIGHT-1m'))
+            self.governor.update(response.headers)
+
+            if response.status_code not in (429, 418):
+                if self.cassette is not None:
+                    self.cassette.record(url, params, response)
+                return response
+
+            # Only pause the shared governor when another attempt will follow
+            if attempt < self.max_retries:
+                delay = self.governor.backoff(response.status_code, response.headers.get('Retry-After'), attempt)
+                self.stats.record_retry(endpoint)
+                time.sleep(delay)
+
+        return response
+
+    def EndpointName(self, url) -> str:
+        '''
+            Key of self.endpoints that url points to, or its path when unknown.
+        '''
+
+        return endpoint_name(url, self.endpoints)
+
+    def RequestWeight(self, url, params=None) -> int:
+        '''
+            REQUEST_WEIGHT of a GET to url (see request_weight).
+        '''
+
+        return request_weight(url, params, self.endpoints)
+
    #General
     def GET_server_time(self):
 
@@ -74,22 +653,42 @@ class Binance:
 
         return self.get(url, params=params, headers=self.headers)
 
-    def GetTradingSymbols(self, quoteAssets:list=None):
+    def GetExchangeInfo(self) -> dict:
         '''
-          Gets All symbols which are tradable (currently)
+            Downloads the full exchangeInfo payload. Prefer GetSymbolIndex, which
+            serves it from the cache.
         '''
 
         url = self.base + self.endpoints["exchangeInfo"]
+        return self.get(url)
 
-        data = self.get(url)
-        if data.__contains__('code'):
+    def GetSymbolIndex(self) -> dict:
+        '''
+            Returns the cached {symbol: metadata} index, see ExchangeInfoCache.
+        '''
+
+        return self.exchange_info.index(self.GetExchangeInfo)
+
+    def GetSymbolMetadata(self, symbol:str) -> dict:
+        '''
+            Returns the indexed metadata of one symbol. Raises KeyError when the
+            symbol is unknown.
+        '''
+
+        return self.GetSymbolIndex()[symbol]
+
+    def GetTradingSymbols(self, quoteAssets:list=None):
+        '''
+          Gets All symbols which are tradable (currently)
+        '''
+
+        if quoteAssets == None:
             return []
 
         symbols_list = []
-        for pair in data['symbols']:
-            if pair['status'] == 'TRADING':
-                if quoteAssets != None and pair['quoteAsset'] in quoteAssets:
-                  symbols_list.append(pair['symbol'])
+        for quote, symbols in self.exchange_info.trading_by_quote(self.GetExchangeInfo).items():
+            if quote in quoteAssets:
+                symbols_list.extend(symbols)
 
         return symbols_list
 
@@ -98,59 +697,40 @@ class Binance:
             Gets All symbols which are tradable (currently)
         '''
 
-        url = self.base + self.endpoints["exchangeInfo"]
-        data = self.get(url)
-        if data.__contains__('code'):
+        if symbols == None:
             return []
 
-        symbols_list = []
+        index = self.GetSymbolIndex()
 
-        for pair in data['symbols']:
-            if pair['status'] == 'TRADING':
-                if symbols != None and pair['symbol'] in symbols:
-                    symbols_list.append(pair)
+        symbols_list = []
+        for symbol in symbols:
+            pair = index.get(symbol)
+            if pair is not None and pair['status'] == 'TRADING':
+                symbols_list.append(pair['raw'])
 
         return symbols_list
 
-    def GetSymbolKlinesExtra(self, symbol:str, interval:str, limit:int=1000):
-        """
-            Basically, we will be calling the GetSymbolKlines as many times as we need
-            in order to get all the historical data required (based on the limit parameter)
-            and we'll be merging the results into one long dataframe.
+    def GetSymbolKlinesExtra(self, symbol:str, interval:str, limit:int=1000, extended:bool=False):
         """
+            Gets the last `limit` candles, even when limit is bigger than the 1000
+            candles Binance returns per request.
 
-        repeat_rounds = 0
-        if limit > 1000:
-            repeat_rounds = int(limit/1000)
-
-        initial_limit = limit % 1000
-        if initial_limit == 0:
-            initial_limit = 1000
-
-        """
-            First, we get the last initial_limit candles, starting at end_time and going
-            backwards (or starting in the present moment, if end_time is False)
+            The window that holds those candles is computed up front and fetched
+            forward with GetSymbolKlinesRange, so the result is sorted by time and
+            has no repeated boundary candles.
         """
 
-        df = self.GetSymbolKlines(symbol, interval, limit=initial_limit)
+        end = self._clock_ms()
+        start = self.IntervalStart(interval, end, limit)
+        df = self.GetSymbolKlinesRange(symbol, interval, start, end, extended)
 
-        while repeat_rounds > 0:
-            """
-                Then, for every other 1000 candles, we get them, but starting at the beginning
-                of the previously received candles.
-            """
-
-            df2 = self.GetSymbolKlines(symbol, interval, limit=1000, end_time=df['time'][0])
-            df = pd.concat([df, df2], ignore_index=True)
-            repeat_rounds = repeat_rounds - 1
-
-        return df
+        return df.tail(limit).reset_index(drop=True)
 
     def Get24hrTicker(self, symbol:str):
         url = self.base + self.endpoints['24hrTicker'] + "?symbol="+symbol
         return self.get(url)
 
-    def GetSymbolKlines(self, symbol:str, interval:str, limit:int=1000, init_time=False, end_time=False):
+    def GetSymbolKlines(self, symbol:str, interval:str, limit:int=1000, init_time=False, end_time=False, extended:bool=False):
         '''
             Gets trading data for one symbol
 
@@ -164,63 +744,218 @@ class Binance:
                 days         '1d' '3d'
                 weeks        '1w'
                 months       '1M;
+
+              init_time, end_time:  optional open time range in ms. When both are
+                                    given the whole range is downloaded with
+                                    GetSymbolKlinesRange and limit is ignored.
+
+              extended bool:     also return quote volume, trade count and taker
+                                 buy volumes (see parse_klines).
         '''
-        limitTable = {
-            "m1": 0,
-            "m3": 0,
-            "m5": 0,
-            "m15": 0,
-            "m30": 0,
-            "h1": 0,
-            "h2": 0,
-            "h4": 0,
-            "d1": 0,
-            "w1": 0,
-        }
 
         if init_time and end_time:
             if end_time > init_time:
-                diff = (end_time - init_time)/1000
-                diffMin = diff/60
-                limitTable['m1'] = int(diffMin)
-                limitTable['m3'] = int(diffMin/3)
-                limitTable['m5'] = int(diffMin/5)
-                limitTable['m15'] = int(diffMin/15)
-                limitTable['m30'] = int(diffMin/30)
-                limitTable['h1'] = int(diffMin/60)
-                limitTable['h2'] = int(limitTable['h1']/2)
-                limitTable['h4'] = int(limitTable['h1']/4)
-                limitTable['d1'] = int(limitTable['h1']/24)
-                limitTable['w1'] = int(limitTable['d1']/7)
-                limit = limitTable[interval[::-1]]
+                return self.GetSymbolKlinesRange(symbol, interval, init_time, end_time, extended)
             else:
                 self.logger.error(f'init_time is bigger than end_time. [{init_time}, {end_time}]')
 
+        if limit > 1000:
+            return self.GetSymbolKlinesExtra(symbol, interval, limit, extended)
 
+        params = {
+            'symbol'  : symbol,
+            'interval': interval,
+            'limit'   : limit,
+        }
 
-        if limit > 1000:
-            return self.GetSymbolKlinesExtra(symbol, interval, limit)
+        klines = self._get_klines(params)
+
+        started = time.perf_counter()
+        df = parse_klines(klines, extended)
+        self.stats.record_parse('klines', time.perf_counter() - started)
+
+        return df
 
-        params = '?&symbol='+symbol+'&interval='+interval+'&limit='+str(limit)
+    def GetSymbolKlinesRange(self, symbol:str, interval:str, start, end=None, extended:bool=False) -> pd.DataFrame:
+        '''
+            Gets every candle whose open time is in [start, end].
 
+            start and end can be ms timestamps, datetimes or date strings; end
+            defaults to now. The range is split by PlanKlineWindows into the
+            minimum number of 1000 candle requests, which are fetched oldest
+            first and merged into one frame sorted by time without duplicates.
+        '''
+        start = self._to_ms(start)
+        end = self._clock_ms() if end is None else self._to_ms(end)
 
-        url = self.base + self.endpoints['klines'] + params
+        windows = self.PlanKlineWindows(interval, start, end)
+        self.logger.info(f'GetSymbolKlinesRange {symbol} {interval}: {len(windows)} requests')
 
-        data = requests.get(url)
-        dictionary = json.loads(data.text)
-        df = pd.DataFrame.from_dict(dictionary)
+        return self.GetSymbolKlinesWindows(symbol, interval, windows, extended)
 
+    def GetSymbolKlinesWindows(self, symbol:str, interval:str, windows:list, extended:bool=False) -> pd.DataFrame:
+        '''
+            Gets the candles of a list of (startTime, endTime) ms windows, one
+            request per window (each must hold at most 1000 candles), merged
+            into one frame sorted by time without duplicates.
+        '''
+        pages = []
+        for window_start, window_end in windows:
+            params = {
+                'symbol'   : symbol,
+                'interval' : interval,
+                'startTime': window_start,
+                'endTime'  : window_end,
+                'limit'    : 1000,
+            }
+            pages.extend(self._get_klines(params))
 
-        df = df.drop(range(6, 12), axis=1)
-        col_names = ['time', 'open', 'high', 'low', 'close', 'volume']
-        df.columns = col_names
+        started = time.perf_counter()
+        df = parse_klines(pages, extended)
+        df = df.drop_duplicates(subset='time').sort_values('time')
+        self.stats.record_parse('klines', time.perf_counter() - started)
 
-        for col in col_names:
-            df[col] = df[col].astype(float)
+        return df.reset_index(drop=True)
 
-        df['date'] = pd.to_datetime(df['time'] * 1000000)
+    @classmethod
+    def PlanKlineWindows(cls, interval:str, start:int, end:int, limit:int=1000) -> list:
+        '''
+            Splits the open time range [start, end] (ms) into (startTime, endTime)
+            windows holding at most `limit` candles each.
 
-        return df
+            Fixed width intervals step by limit * interval length; '1M' steps by
+            calendar months. The number of windows is ceil(candles / limit).
+        '''
+        if interval not in cls.KLINE_INTERVALS:
+            raise ValueError(f'Unknown interval {interval}, expected one of {cls.KLINE_INTERVALS}')
+
+        windows = []
+        if end < start:
+            return windows
+
+        if interval == '1M':
+            window_start = pd.Timestamp(start, unit='ms')
+            while cls._ts_to_ms(window_start) <= end:
+                window_end = window_start + pd.DateOffset(months=limit)
+                windows.append((cls._ts_to_ms(window_start), min(cls._ts_to_ms(window_end) - 1, end)))
+                window_start = window_end
+            return windows
+
+        step = cls.INTERVAL_MS[interval] * limit
+        for window_start in range(start, end + 1, step):
+            windows.append((window_start, min(window_start + step - 1, end)))
+
+        return windows
+
+    @classmethod
+    def IntervalStart(cls, interval:str, end:int, count:int) -> int:
+        '''
+            Returns the start (ms) of the range holding the last `count` candle
+            open times up to `end`.
+        '''
+        if interval == '1M':
+            return cls._ts_to_ms(pd.Timestamp(end, unit='ms') - pd.DateOffset(months=count)) + 1
+
+        return end - cls.INTERVAL_MS[interval] * count + 1
+
+    @classmethod
+    def CandleOpenTime(cls, interval:str, ts:int) -> int:
+        '''
+            Returns the open time (ms) of the candle of `interval` containing
+            the ms timestamp ts. Weekly candles open on Mondays, '1M' candles on
+            the first day of the month (UTC).
+        '''
+        if interval == '1M':
+            return int(np.datetime64(int(ts), 'ms').astype('datetime64[M]').astype('datetime64[ms]').astype('int64'))
+
+        offset = cls.WEEK_OFFSET_MS if interval == '1w' else 0
+        return ts - (ts - offset) % cls.INTERVAL_MS[interval]
+
+    def _get_klines(self, params:dict) -> list:
+        '''
+            Raw /api/v3/klines request. Returns the list of kline rows and raises
+            when Binance answers with an error, so callers can tell a failed
+            download from an empty range.
+        '''
+        return self._get_rows('klines', params)
+
+    def _get_rows(self, endpoint:str, params:dict) -> list:
+        '''
+            Request to an endpoint answering a JSON list; raises on error answers.
+        '''
+        url = self.base + self.endpoints[endpoint]
+
+        response = self._request(url, params=params, headers=self.headers)
+        data = json.loads(response.text)
+
+        if not isinstance(data, list):
+            self.logger.warning(f'{endpoint} request failed {params}: {data}')
+            raise ValueError(f"{endpoint} request failed for {params.get('symbol')} {params.get('interval', '')}: {data}")
+
+        return data
+
+    @staticmethod
+    def _to_ms(value) -> int:
+        if isinstance(value, (int, float)):
+            return int(value)
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert('UTC').tz_localize(None)
+        return Binance._ts_to_ms(ts)
+
+    @staticmethod
+    def _ts_to_ms(ts) -> int:
+        return int((ts - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1))
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(pd.Timestamp.now('UTC').timestamp() * 1000)
+
+    def _clock_ms(self) -> int:
+        '''Current time (ms), or the recording's time while a cassette is attached'''
+        if self.cassette is not None and self.cassette.now is not None:
+            return self.cassette.now
+        return self._now_ms()
+
+    def GetAggTrades(self, symbol:str, start, end=None) -> pd.DataFrame:
+        '''
+            Gets every aggregated trade of symbol with time in [start, end].
+
+            The first page is located with a startTime/endTime window (Binance
+            allows at most one hour per window; empty hours are skipped), then
+            pages of 1000 trades are followed by fromId until end is reached.
+            Returns a frame with the columns of parse_agg_trades.
+        '''
+        start = self._to_ms(start)
+        end = self._clock_ms() if end is None else self._to_ms(end)
+        hour = 60 * 60 * 1000
+        limit = 1000
+
+        params = {'symbol': symbol, 'startTime': start, 'endTime': min(start + hour - 1, end), 'limit': limit}
+        trades = []
+
+        while True:
+            page = self._get_rows('aggTrades', params)
+            trades.extend(page)
+
+            if page and page[-1]['T'] >= end:
+                break
+            if len(page) == limit:
+                params = {'symbol': symbol, 'fromId': page[-1]['a'] + 1, 'limit': limit}
+            elif 'fromId' in params:
+                break
+            else:
+                window_start = params['endTime'] + 1
+                if window_start > end:
+                    break
+                params = {'symbol': symbol, 'startTime': window_start, 'endTime': min(window_start + hour - 1, end), 'limit': limit}
+
+        self.logger.info(f'GetAggTrades {symbol}: {len(trades)} trades')
+
+        df = parse_agg_trades(trades)
+        df = df[(df['time'] >= start) & (df['time'] <= end)]
+
+        return df.drop_duplicates(subset='agg_id').reset_index(drop=True)
 
     def GetOrderBook(self, symbol:str, limit:int=100):
 
@@ -239,33 +974,24 @@ class Binance:
         return self.get(url, params=params, headers=self.headers)
 
     def GetSortedOrderBook(self, symbol:str="BTCUSDT", limit:int=100)->pd.DataFrame():
+        """
+            Order book snapshot as a frame: bidsPrice/bidsQty from the best bid
+            down and asksPrice/asksQty from the best ask up. For a book kept up
+            to date without REST calls see order_book.LocalOrderBook.
+        """
 
         orderBook = self.GetOrderBook(symbol=symbol, limit=limit)
-        df = self._df = pd.DataFrame()
-
-
-
-        price_list = []
-        qty_list = []
-
-        for x in orderBook['asks']:
-            price_list.append(x[0])
-            qty_list.append(x[1])
-
-        df['bidsPrice'] = price_list
-        df['bidsQty'] = qty_list
 
+        bids = np.asarray(orderBook['bids'], dtype=np.float64).reshape(-1, 2)
+        asks = np.asarray(orderBook['asks'], dtype=np.float64).reshape(-1, 2)
+        n = min(len(bids), len(asks))
 
-        price_list = []
-        qty_list = []
-
-        for x in orderBook['bids']:
-            price_list.append(x[0])
-            qty_list.append(x[1])
-
-        df['asksPrice'] = price_list
-        df['asksQty'] = qty_list
-        df = df.astype(float)
+        df = self._df = pd.DataFrame({
+            'bidsPrice': bids[:n, 0],
+            'bidsQty'  : bids[:n, 1],
+            'asksPrice': asks[:n, 0],
+            'asksQty'  : asks[:n, 1],
+        })
 
         return df
 
@@ -283,21 +1009,80 @@ class Binance:
 
         return self.get(url, params=params, headers=self.headers)
 
+   #Bulk snapshots
+    def GetPrices(self, symbols:list=None) -> dict:
+        """
+            Latest price of many symbols in one request: {symbol: {'symbol', 'price'}}.
+            The all-symbols ticker (weight 4) is fetched once per snapshot TTL
+            and shared by every caller; symbols=None returns the whole market.
+        """
+
+        return self._bulk_snapshot('price', symbols)
+
+    def GetBestPQOrderBooks(self, symbols:list=None) -> dict:
+        """
+            Best bid/ask price and quantity of many symbols in one request:
+            {symbol: bookTicker entry}. Served like GetPrices.
+        """
+
+        return self._bulk_snapshot('bestPQOrderBook', symbols)
+
+    def Get24hrTickers(self, symbols:list=None) -> dict:
+        """
+            24h statistics of many symbols: {symbol: ticker}. Up to 100 symbols
+            use the symbols=[...] form, larger or empty lists the all-symbols
+            form (weight 80).
+        """
+
+        if symbols and len(symbols) <= 100:
+            return self._bulk_snapshot('24hrTicker', symbols, all_symbols=False)
+
+        return self._bulk_snapshot('24hrTicker', symbols)
+
+    def GetAvPrices(self, symbols:list, max_workers:int=8) -> dict:
+        """
+            Average price of many symbols: {symbol: avgPrice answer}. Binance has
+            no multi-symbol avgPrice, so the requests run in parallel over the
+            pooled session and identical concurrent requests are coalesced.
+        """
+
+        def fetch(symbol):
+            return self.snapshots.get(('averagePrice', symbol), lambda: self.GetAvPrice(symbol))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            answers = dict(zip(symbols, pool.map(fetch, symbols)))
+
+        return {symbol: data for symbol, data in answers.items() if 'code' not in data}
+
+    def _bulk_snapshot(self, endpoint:str, symbols:list=None, all_symbols:bool=True) -> dict:
+
+        url = self.base + self.endpoints[endpoint]
+
+        if all_symbols:
+            key, params = (endpoint, None), None
+        else:
+            selected = sorted(set(symbols))
+            key = (endpoint, tuple(selected))
+            params = {'symbols': json.dumps(selected, separators=(',', ':'))}
+
+        data = self.snapshots.get(key, lambda: self.get(url, params=params, headers=self.headers))
+        if isinstance(data, dict):
+            self.logger.warning(f"{endpoint} snapshot failed: {data.get('msg')}")
+            return {}
+
+        if symbols is None:
+            return {entry['symbol']: entry for entry in data}
+
+        wanted = set(symbols)
+        return {entry['symbol']: entry for entry in data if entry['symbol'] in wanted}
+
     def GetLotFilte(self, symbol:str) -> dict:
         """
             This function return a dictionary with information about the pair.
             This information will be use to know the correct amount format to trade.
         """
 
-        symbol_data = self.GetSymbolDataOfSymbols([symbol])[0]
-
-        lot_filter = {}
-        for fil in symbol_data["filters"]:
-            if fil["filterType"] == "LOT_SIZE":
-                lot_filter = fil
-                break
-
-        return lot_filter
+        return self.GetSymbolMetadata(symbol)['filters'].get('LOT_SIZE', {})
 
     def GetPriceFilter(self, symbol:str) -> dict:
         """
@@ -305,15 +1090,7 @@ class Binance:
             This information will be use to know the correct amount to spend.
         """
 
-        symbol_data = self.GetSymbolDataOfSymbols([symbol])[0]
-
-        price_filter = {}
-        for fil in symbol_data["filters"]:
-            if fil["filterType"] == "PRICE_FILTER":
-                price_filter = fil
-                break
-
-        return price_filter
+        return self.GetSymbolMetadata(symbol)['filters'].get('PRICE_FILTER', {})
 
     def GetMinNotional(self, symbol:str) -> dict:
         """
@@ -321,15 +1098,7 @@ class Binance:
             This information will be use to know the correct amount to spend.
         """
 
-        symbol_data = self.GetSymbolDataOfSymbols([symbol])[0]
-
-        min_notional = {}
-        for fil in symbol_data["filters"]:
-            if fil["filterType"] == "MIN_NOTIONAL":
-                min_notional = fil
-                break
-
-        return min_notional
+        return self.GetSymbolMetadata(symbol)['filters'].get('MIN_NOTIONAL', {})
 
    #Export
     def exportOrderBook(self, symbol:str, limit:int=100):
@@ -341,14 +1110,10 @@ class Binance:
         price = self.GetPrice(symbol)
         newlist = [[price['price'], 0.0000000]]
 
-        df = pd.DataFrame(bids)
-        df = df.append(newlist)
-        df = df.append(asks)
-
-        df.columns = ['price', 'amount']
+        df = pd.DataFrame(bids + newlist + asks, columns=['price', 'amount']).astype(float)
         df.sort_values(by=['price'], inplace=True)
 
-        current_time = datetime.datetime.now()
+        current_time = datetime.now()
         orderbookfilename = "../"+str(current_time.day)+"."\
                                  +str(current_time.month)+"."\
                                  +str(current_time.year)+"-"\
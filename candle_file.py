@@ -0,0 +1,209 @@
+"""
+Candle File - Fixed-width binary candle format for zero-copy loading
+
+A .candles file is a small header followed by one fixed-width record per
+candle:
+
+    bytes 0-7      magic b'CANDLES\\0'
+    bytes 8-11     header size H (uint32 little endian, multiple of 64)
+    bytes 12-H     JSON header: version, symbol, interval, rows, the record
+                   dtype and the categories of text columns (padded with spaces)
+    bytes H-       rows * dtype.itemsize bytes of records
+
+Every record holds 'time' (int64 ms open time) first, then the numeric columns
+of the dataset (float64, int64 for integer columns). Text columns such as
+squeeze_state are stored as int32 category codes (-1 for missing).
+CandleFile memory-maps the records, so opening a multi-million-row file
+costs nothing and every slice is a view of the page cache instead of a
+parsed copy.
+
+    write_candles('data/exports/latest_dataset.candles', df, 'BTCUSDT', '1m')
+
+    candles = CandleFile('data/exports/latest_dataset.candles')
+    close = candles.column('close', '2024-05-01', '2024-06-01')   # numpy view
+    df = candles.frame()                                          # for plotting
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+MAGIC = b'CANDLES\0'
+HEADER_ALIGN = 64
+VERSION = 1
+EXTENSION = '.candles'
+
+
+def is_candle_file(path):
+    """True if path looks like a .candles file (by extension or magic bytes)"""
+    if str(path).endswith(EXTENSION):
+        return True
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def candle_dtype(df):
+    """
+    Record dtype and text categories for a candle frame
+
+    Returns:
+        (dtype with 'time' first, {column: categories} of the text columns)
+    """
+    dtype, categories, _ = _layout(df)
+    return dtype, categories
+
+
+def _layout(df):
+    """candle_dtype plus the int32 category codes of every text column"""
+    fields = [('time', '<i8')]
+    categories = {}
+    codes = {}
+    for name in df.columns:
+        if name in ('time', 'date'):
+            continue
+        kind = df[name].dtype.kind
+        if kind == 'b':
+            fields.append((name, '?'))
+        elif kind in 'iu':
+            fields.append((name, '<i8'))
+        elif kind == 'f':
+            fields.append((name, '<f8'))
+        else:
+            # Codes come from the factorization itself: matching values
+            # against their str() categories loses every non-string value
+            codes[name], uniques = pd.factorize(df[name])
+            fields.append((name, '<i4'))
+            categories[name] = [str(value) for value in uniques]
+    return np.dtype(fields), categories, codes
+
+
+def _open_times(df):
+    """int64 ms open times from a 'time' column or a parsed/string 'date' column"""
+    if 'time' in df.columns:
+        return df['time'].to_numpy(dtype='int64')
+    if 'date' in df.columns:
+        dates = df['date']
+    elif isinstance(df.index, pd.DatetimeIndex):
+        dates = df.index.to_series()
+    else:
+        raise ValueError("Candle frame needs a 'time' or 'date' column")
+    return pd.to_datetime(dates).to_numpy(dtype='datetime64[ms]').view('int64')
+
+
+def write_candles(path, df, symbol, interval):
+    """
+    Write a candle frame as a .candles file
+
+    The file is written to a temporary name and renamed into place, so readers
+    that have the previous version memory-mapped keep a consistent view.
+
+    Returns:
+        Number of records written
+    """
+    dtype, categories, codes = _layout(df)
+    header = json.dumps({
+        'version': VERSION,
+        'symbol': symbol,
+        'interval': interval,
+        'rows': len(df),
+        'dtype': [list(field) for field in dtype.descr],
+        'categories': categories,
+    }).encode()
+    header_size = -(-(len(MAGIC) + 4 + len(header)) // HEADER_ALIGN) * HEADER_ALIGN
+
+    records = np.empty(len(df), dtype=dtype)
+    records['time'] = _open_times(df)
+    for name in dtype.names[1:]:
+        if name in codes:
+            records[name] = codes[name]
+        else:
+            records[name] = df[name].to_numpy(dtype=dtype[name])
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + np.uint32(header_size).tobytes() + header.ljust(header_size - len(MAGIC) - 4))
+        records.tofile(f)
+    os.replace(tmp, path)
+    return len(records)
+
+
+class CandleFile:
+    """Read-only memory-mapped view of a .candles file"""
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a candle file")
+            header_size = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+            meta = json.loads(f.read(header_size - len(MAGIC) - 4).decode())
+        if meta['version'] != VERSION:
+            raise ValueError(f"Unsupported candle file version {meta['version']} in {path}")
+
+        self.symbol = meta['symbol']
+        self.interval = meta['interval']
+        self.version = meta['version']
+        self.dtype = np.dtype([tuple(field) for field in meta['dtype']])
+        self.categories = meta.get('categories', {})
+        self.records = np.memmap(path, dtype=self.dtype, mode='r', offset=header_size, shape=(meta['rows'],)) \
+            if meta['rows'] else np.empty(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def columns(self):
+        return list(self.dtype.names)
+
+    @property
+    def time(self):
+        """int64 ms open times (view)"""
+        return self.records['time']
+
+    def bounds(self, start=None, end=None):
+        """Row range [lo, hi) of candles opening in [start, end)"""
+        time = self.time
+        lo = 0 if start is None else int(np.searchsorted(time, self._to_ms(start), side='left'))
+        hi = len(time) if end is None else int(np.searchsorted(time, self._to_ms(end), side='left'))
+        return lo, max(lo, hi)
+
+    def slice(self, start=None, end=None):
+        """Records of candles opening in [start, end) (view)"""
+        lo, hi = self.bounds(start, end)
+        return self.records[lo:hi]
+
+    def column(self, name, start=None, end=None):
+        """One column over [start, end) as a NumPy view, ready for indicator code"""
+        return self.slice(start, end)[name]
+
+    def frame(self, start=None, end=None):
+        """
+        DataFrame of [start, end) indexed by open time
+
+        Numeric columns are copied out of the map once (pandas needs contiguous
+        columns); text columns come back as categoricals. The memory map itself
+        is untouched.
+        """
+        records = self.slice(start, end)
+        data = {}
+        for name in self.dtype.names[1:]:
+            values = np.ascontiguousarray(records[name])
+            if name in self.categories:
+                values = pd.Categorical.from_codes(values, categories=self.categories[name])
+            data[name] = values
+        index = pd.DatetimeIndex(np.asarray(records['time']).view('datetime64[ms]'), name='date')
+        return pd.DataFrame(data, index=index)
+
+    @staticmethod
+    def _to_ms(value):
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        return int(pd.Timestamp(value).value // 1_000_000)
@@ -0,0 +1,174 @@
+"""
+Candle Integrity - Vectorized duplicate, ordering and gap checks for klines
+
+Every check works on the int64 open times of a whole series at once: the open
+times are mapped to interval slots (fixed width intervals by their length,
+'1M' by calendar month) and one np.diff tells duplicates (step 0), reversals
+(step < 0) and gaps (step > 1) apart.
+
+Missing spans are then grouped into the fewest kline requests that cover them
+(neighbouring gaps share a request when they fit in one 1000 candle window)
+and only those are downloaded.
+
+    validator = CandleValidator(Binance())
+    df, report = validator.validate(df, 'BTCUSDT', '1h')
+    print(report.summary())
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from binanceExc import Binance
+
+
+@dataclass
+class IntegrityReport:
+    """Result of checking one candle series"""
+
+    interval: str
+    rows: int = 0
+    duplicates: int = 0
+    reversals: int = 0
+    gaps: List[Tuple[int, int]] = field(default_factory=list)   # missing open times [start, end] (ms)
+    missing: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not (self.duplicates or self.reversals or self.gaps)
+
+    def summary(self) -> str:
+        return (f"{self.rows} candles {self.interval}: {self.duplicates} duplicates, "
+                f"{self.reversals} out of order, {len(self.gaps)} gaps ({self.missing} missing candles)")
+
+
+def _slots(times, interval):
+    """Interval slot of every open time (consecutive candles differ by 1)"""
+    if interval == '1M':
+        return times.view('datetime64[ms]').astype('datetime64[M]').astype('int64')
+    return (times - times.min()) // Binance.INTERVAL_MS[interval]
+
+
+def _slot_times(slots, times, interval):
+    """Inverse of _slots: open time (ms) of every slot"""
+    if interval == '1M':
+        return slots.astype('datetime64[M]').astype('datetime64[ms]').astype('int64')
+    return times.min() + slots * Binance.INTERVAL_MS[interval]
+
+
+def check_candles(times, interval) -> IntegrityReport:
+    """
+    Check an array of int64 ms open times in their current order
+
+    Duplicates and reversals are counted on the series as given; gaps are
+    measured on the sorted, de-duplicated open times.
+    """
+    times = np.asarray(times, dtype='int64')
+    report = IntegrityReport(interval=interval, rows=len(times))
+    if len(times) < 2:
+        return report
+
+    step = np.diff(_slots(times, interval))
+    report.reversals = int(np.count_nonzero(step < 0))
+
+    ordered = times if not report.reversals else np.sort(times, kind='stable')
+    unique = ordered[np.concatenate(([True], ordered[1:] != ordered[:-1]))]
+    report.duplicates = len(times) - len(unique)
+
+    slots = _slots(unique, interval)
+    step = np.diff(slots)
+    at = np.flatnonzero(step > 1)
+    if len(at):
+        starts = _slot_times(slots[at] + 1, unique, interval)
+        ends = _slot_times(slots[at + 1] - 1, unique, interval)
+        report.gaps = list(zip(starts.tolist(), ends.tolist()))
+        report.missing = int((step[at] - 1).sum())
+
+    return report
+
+
+def clean_candles(df) -> pd.DataFrame:
+    """Sort by open time and keep the last copy of each duplicated candle"""
+    if df['time'].is_monotonic_increasing and df['time'].is_unique:
+        return df
+    df = df.sort_values('time', kind='stable')
+    return df.drop_duplicates(subset='time', keep='last').reset_index(drop=True)
+
+
+def plan_backfill(gaps, interval, limit=1000) -> list:
+    """
+    Fewest (startTime, endTime) kline windows covering every gap
+
+    Consecutive gaps are merged into one window while the merged span holds at
+    most `limit` candles; larger gaps are split by Binance.PlanKlineWindows.
+    """
+    windows = []
+    if interval == '1M':
+        for start, end in gaps:
+            windows.extend(Binance.PlanKlineWindows(interval, start, end, limit))
+        return windows
+
+    span = Binance.INTERVAL_MS[interval] * limit
+    window_start = window_end = None
+    for start, end in gaps:
+        if window_start is not None and end - window_start < span:
+            window_end = end
+            continue
+        if window_start is not None:
+            windows.append((window_start, window_end))
+        if end - start < span:
+            window_start, window_end = start, end
+        else:
+            windows.extend(Binance.PlanKlineWindows(interval, start, end, limit))
+            window_start = None
+    if window_start is not None:
+        windows.append((window_start, window_end))
+    return windows
+
+
+class CandleValidator:
+    """Checks downloaded candles and backfills the missing spans"""
+
+    def __init__(self, exchange=None):
+        self.exchange = exchange or Binance()
+        self.logger = structlog.get_logger(__name__)
+
+    def validate(self, df, symbol, interval, backfill=True):
+        """
+        Clean a kline frame and download its missing candles
+
+        Args:
+            df: Frame with an int64 'time' column (as returned by the Binance client)
+            symbol: Trading pair symbol
+            interval: Kline interval of df
+            backfill: Download the gaps (otherwise only report them)
+
+        Returns:
+            (clean frame, IntegrityReport of the input)
+        """
+        report = check_candles(df['time'].to_numpy(), interval)
+        if report.ok:
+            return df, report
+
+        self.logger.warning(f"Candle integrity {symbol}: {report.summary()}")
+        df = clean_candles(df)
+
+        if backfill and report.gaps:
+            windows = plan_backfill(report.gaps, interval)
+            print(f"🩹 Backfilling {report.missing} missing {interval} candles with {len(windows)} requests")
+
+            filled = self.exchange.GetSymbolKlinesWindows(symbol, interval, windows)
+            if not filled.empty:
+                filled = filled[~filled['time'].isin(df['time'])]
+                df = clean_candles(pd.concat([df, filled.reindex(columns=df.columns)], ignore_index=True))
+
+            remaining = check_candles(df['time'].to_numpy(), interval)
+            if remaining.gaps:
+                # Exchange outages have no candles to download
+                self.logger.warning(f"Candle integrity {symbol}: {len(remaining.gaps)} gaps remain after backfill "
+                                    f"({remaining.missing} candles)")
+
+        return df, report
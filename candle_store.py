@@ -0,0 +1,189 @@
+"""
+Candle Store - Local Parquet store of candles with incremental sync
+
+Closed candles are kept in one Parquet file per symbol, interval and month:
+
+    <root>/symbol=BTCUSDT/interval=1h/month=2024-05/candles.parquet
+
+sync() downloads only the candles after the last stored open time and
+rewrites just the months it touches. The oldest time already backfilled is
+kept in <root>/symbol=.../interval=.../meta.json, so a start before the
+symbol listed is requested once rather than on every sync. read() opens only the month files that
+overlap the requested range and pushes the time filter down to the Parquet
+row groups, so the pipeline reads from disk instead of the network.
+
+    store = CandleStore('data/candles')
+    store.sync('BTCUSDT', '1h', start='2020-01-01')
+    df = store.read('BTCUSDT', '1h', start='2024-01-01')
+"""
+
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import structlog
+
+from binanceExc import Binance
+
+
+class CandleStore:
+    """Month-partitioned Parquet candle store"""
+    
+    def __init__(self, root='data/candles', exchange=None, compression='zstd', row_group_size=50000):
+        self.root = root
+        self.exchange = exchange
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.logger = structlog.get_logger(__name__)
+    
+    def directory(self, symbol, interval):
+        return os.path.join(self.root, f'symbol={symbol}', f'interval={interval}')
+    
+    def months(self, symbol, interval):
+        """Stored months ('YYYY-MM'), oldest first"""
+        directory = self.directory(symbol, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[len('month='):] for name in os.listdir(directory)
+                      if name.startswith('month=') and os.path.exists(self._month_path(symbol, interval, name[len('month='):])))
+    
+    def first_open_time(self, symbol, interval):
+        """Open time (ms) of the oldest stored candle, or None when empty"""
+        months = self.months(symbol, interval)
+        if not months:
+            return None
+        table = pq.read_table(self._month_path(symbol, interval, months[0]), columns=['time'])
+        return int(pc.min(table['time']).as_py())
+    
+    def last_open_time(self, symbol, interval):
+        """Open time (ms) of the newest stored candle, or None when empty"""
+        months = self.months(symbol, interval)
+        if not months:
+            return None
+        table = pq.read_table(self._month_path(symbol, interval, months[-1]), columns=['time'])
+        return int(pc.max(table['time']).as_py())
+    
+    def covered_from(self, symbol, interval):
+        """Oldest time (ms) the store has been backfilled from, or None"""
+        return self._metadata(symbol, interval).get('covered_from')
+    
+    def sync(self, symbol, interval, start=None):
+        """
+        Download and store the closed candles after the last stored one, and
+        the ones between start (ms, datetime or date string) and the first
+        stored one when start is older than what was backfilled before (a
+        symbol has nothing before its listing). An empty store starts
+        at start or, when start is not given, with the last 1000 candles.
+        Returns the number of new candles.
+        """
+        exchange = self._exchange()
+        start = Binance._to_ms(start) if start is not None else None
+        first = self.first_open_time(symbol, interval)
+        last = self.last_open_time(symbol, interval)
+        
+        covered = self.covered_from(symbol, interval)
+        backfilled = False
+        
+        if last is not None:
+            df = exchange.GetSymbolKlinesRange(symbol, interval, last + 1)
+            if start is not None and start < min(first, covered if covered is not None else first):
+                older = exchange.GetSymbolKlinesRange(symbol, interval, start, first - 1)
+                df = pd.concat([older, df], ignore_index=True)
+                backfilled = True
+        elif start is not None:
+            df = exchange.GetSymbolKlinesRange(symbol, interval, start)
+            backfilled = True
+        else:
+            df = exchange.GetSymbolKlines(symbol, interval)
+        
+        # The newest candle is still open: store it once it has closed
+        df = df[df['close_time'] < exchange._clock_ms()]
+        
+        self.write(symbol, interval, df)
+        if backfilled and len(self.months(symbol, interval)) > 0:
+            self._save_metadata(symbol, interval, covered_from=start)
+        self.logger.info(f'Synced {len(df)} {symbol} {interval} candles into {self.root}')
+        return len(df)
+    
+    def write(self, symbol, interval, df):
+        """Merge candles into their month files (newer rows replace stored ones)"""
+        if len(df) == 0:
+            return
+        
+        df = df.drop(columns=['date'], errors='ignore')
+        months = pd.Series(df['time'].to_numpy().astype('datetime64[ms]')).dt.strftime('%Y-%m').to_numpy()
+        
+        for month in pd.unique(months):
+            part = df[months == month]
+            path = self._month_path(symbol, interval, month)
+            
+            if os.path.exists(path):
+                stored = pq.read_table(path).to_pandas()
+                part = pd.concat([stored, part[stored.columns.intersection(part.columns)]], ignore_index=True)
+                part = part.drop_duplicates(subset='time', keep='last')
+            
+            part = part.sort_values('time', ignore_index=True)
+            
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            pq.write_table(pa.Table.from_pandas(part, preserve_index=False), tmp_path,
+                           compression=self.compression, row_group_size=self.row_group_size)
+            os.replace(tmp_path, path)
+    
+    def read(self, symbol, interval, start=None, end=None, columns=None):
+        """
+        Stored candles with start <= open time <= end (ms, datetimes or date
+        strings), sorted by time, with the 'date' column restored.
+        """
+        start = Binance._to_ms(start) if start is not None else None
+        end = Binance._to_ms(end) if end is not None else None
+        
+        first_month = pd.Timestamp(start, unit='ms').strftime('%Y-%m') if start is not None else None
+        last_month = pd.Timestamp(end, unit='ms').strftime('%Y-%m') if end is not None else None
+        paths = [
+            self._month_path(symbol, interval, month) for month in self.months(symbol, interval)
+            if (first_month is None or month >= first_month) and (last_month is None or month <= last_month)
+        ]
+        if not paths:
+            return pd.DataFrame(columns=(columns or ['time', 'open', 'high', 'low', 'close', 'volume', 'close_time']) + ['date'])
+        
+        condition = None
+        if start is not None:
+            condition = ds.field('time') >= start
+        if end is not None:
+            condition = ds.field('time') <= end if condition is None else condition & (ds.field('time') <= end)
+        
+        if columns is not None and 'time' not in columns:
+            columns = ['time'] + list(columns)
+        
+        table = ds.dataset(paths, format='parquet').to_table(columns=columns, filter=condition)
+        df = table.to_pandas()
+        df['date'] = df['time'].to_numpy().astype('datetime64[ms]')
+        return df
+    
+    def _exchange(self):
+        if self.exchange is None:
+            self.exchange = Binance()
+        return self.exchange
+    
+    def _metadata(self, symbol, interval):
+        path = os.path.join(self.directory(symbol, interval), 'meta.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+    
+    def _save_metadata(self, symbol, interval, **values):
+        path = os.path.join(self.directory(symbol, interval), 'meta.json')
+        metadata = {**self._metadata(symbol, interval), **values}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, path)
+    
+    def _month_path(self, symbol, interval, month):
+        return os.path.join(self.directory(symbol, interval), f'month={month}', 'candles.parquet')
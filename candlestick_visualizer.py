@@ -3,13 +3,14 @@ Candlestick Visualizer
 Visualizador interactivo de velas japonesas con indicadores técnicos
 """
 
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.offline as pyo
 import argparse
 import os
 
+from dataset_writer import read_dated_frame
+
 
 class CandlestickVisualizer:
     """Visualizador interactivo de velas japonesas"""
@@ -18,14 +19,11 @@ class CandlestickVisualizer:
         self.fig = None
         
     def load_data(self, csv_path):
-        """Cargar datos desde CSV"""
+        """Cargar datos desde CSV, Parquet/Feather o archivo binario .candles"""
         print(f"📁 Cargando datos desde: {csv_path}")
         
-        df = pd.read_csv(csv_path)
-        
-        # Convertir fecha a datetime y establecer como índice
-        df['date'] = pd.to_datetime(df['date'])
-        df.set_index('date', inplace=True)
+        # Archivos .candles mapeados en memoria; índice de fechas desde 'time' (int64 ms) o 'date' (Label Studio)
+        df = read_dated_frame(csv_path)
         
         print(f"✅ Datos cargados: {len(df)} velas")
         print(f"📊 Columnas disponibles: {list(df.columns)}")
@@ -230,7 +228,7 @@ class CandlestickVisualizer:
 def main():
     """Función principal"""
     parser = argparse.ArgumentParser(description='Visualizador de Velas Japonesas')
-    parser.add_argument('--file', required=True, help='Ruta al archivo CSV')
+    parser.add_argument('--file', required=True, help='Ruta al archivo CSV, .parquet, .feather o .candles')
     parser.add_argument('--output', help='Guardar como archivo HTML')
     parser.add_argument('--title', default='Análisis de Trading', help='Título del gráfico')
     
@@ -0,0 +1,137 @@
+"""
+Cassette - Record/replay of Binance REST responses
+
+In record mode every response the client receives is stored under a key made
+of the endpoint path and its sorted query parameters. In replay mode those
+responses are served from memory without touching the network, so pipeline
+runs become reproducible and can be benchmarked offline.
+
+Request windows are computed from the current time (e.g. the startTime of
+the last `limit` klines), so the recording's time is stored with the
+responses and the client uses it as its clock while a cassette is attached:
+a replayed run asks for exactly the requests that were recorded.
+
+The cassette file is a gzip compressed JSON document.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import structlog
+
+
+class CassetteResponse:
+    """Minimal stand-in for requests.Response served from a cassette"""
+    
+    def __init__(self, status_code, headers, text):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+    
+    def json(self):
+        return json.loads(self.text)
+
+
+class Cassette:
+    """Records or replays HTTP GET responses keyed by endpoint and params"""
+    
+    MODES = ('record', 'replay')
+    VERSION = 2
+    
+    # Response headers worth keeping (the rest only bloat the file)
+    KEPT_HEADERS = ('X-MBX-USED-WEIGHT-1m', 'Retry-After', 'Content-Type')
+    
+    def __init__(self, path, mode='replay'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode {mode}, expected one of {self.MODES}")
+        
+        self.path = path
+        self.mode = mode
+        self.logger = structlog.get_logger(__name__)
+        
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        
+        # Time (ms) the client runs at: now when recording, the recording's when replaying
+        self.now = int(time.time() * 1000) if mode == 'record' else None
+        
+        if os.path.exists(path):
+            self._load()
+        elif mode == 'replay':
+            raise FileNotFoundError(f"Cassette not found: {path}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.save()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+    
+    @staticmethod
+    def key(url, params=None):
+        """Endpoint path plus sorted query parameters (from url and params)"""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query)
+        if params:
+            query.extend((k, str(v)) for k, v in params.items())
+        return parts.path + '?' + urlencode(sorted(query))
+    
+    def play(self, url, params=None):
+        """Return the recorded response for this request"""
+        key = self.key(url, params)
+        try:
+            status, headers, text = self._entries[key]
+        except KeyError:
+            raise LookupError(f"Request not in cassette {self.path}: {key}")
+        return CassetteResponse(status, headers, text)
+    
+    def record(self, url, params, response):
+        """Store a live response (requests.Response or aiohttp-like)"""
+        headers = {h: response.headers[h] for h in self.KEPT_HEADERS if h in response.headers}
+        entry = [response.status_code, headers, response.text]
+        
+        with self._lock:
+            self._entries[self.key(url, params)] = entry
+            self._dirty = True
+    
+    def save(self):
+        """Write the recorded responses to disk (record mode only)"""
+        if self.mode != 'record' or not self._dirty:
+            return
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with self._lock:
+            payload = {'version': self.VERSION, 'now': self.now, 'entries': self._entries}
+            tmp_path = self.path + '.tmp'
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(payload, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        
+        self.logger.info(f"Cassette saved: {self.path} ({len(self._entries)} responses)")
+    
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        
+        # Version 1 cassettes have no recording time; they replay against the live clock
+        if payload.get('version') not in (1, self.VERSION):
+            raise ValueError(f"Unsupported cassette version {payload.get('version')} in {self.path}")
+        
+        self._entries = payload['entries']
+        if self.replaying:
+            self.now = payload.get('now')
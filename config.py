@@ -22,17 +22,44 @@ class TradingConfig:
     atr_period: int = 14
     smi_period: int = 18
     
+    # Coarser intervals resampled from the download and joined without look-ahead (see resampler.py)
+    higher_timeframes: list = None  # type: ignore
+    
     # Output settings
     output_dir: str = "data/processed"
     raw_dir: str = "data/raw"
     exports_dir: str = "data/exports"
     label_studio_config: str = "label_studio_config.xml"
     
-    def get_output_filename(self) -> str:
-        """Generate automatic filename: SYMBOL_INTERVAL_timestamp.csv"""
+    # Processed dataset format: parquet, feather or csv (see dataset_writer.py)
+    output_format: str = "parquet"
+    
+    # Index of already produced datasets (see dataset_catalog.py); None disables it
+    catalog_path: str = "data/catalog.json"
+    
+    # Directory of Binance kline zip archives to load history from (see archive_importer.py)
+    archive_dir: str = None  # type: ignore
+    
+    # Root of the Parquet candle store to sync and read from (see candle_store.py)
+    store_dir: str = None  # type: ignore
+    
+    # Check downloaded candles for duplicates/gaps and backfill missing spans (see candle_integrity.py)
+    validate_data: bool = True
+    
+    # Exchange REST root, e.g. a local_binance_server.py instance (default: Binance)
+    api_base: str = None  # type: ignore
+    
+    # Record/replay of exchange responses (see cassette.py)
+    cassette_path: str = None  # type: ignore
+    cassette_mode: str = "replay"
+    
+    def get_output_filename(self, key: str = None) -> str:
+        """Generate automatic filename: SYMBOL_INTERVAL_key.<format> (SYMBOL_INTERVAL_timestamp.<format> without a catalog key)"""
+        if key:
+            return f"{self.symbol}_{self.interval}_{key[:16]}.{self.output_format}"
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"{self.symbol}_{self.interval}_{timestamp}.csv"
+        return f"{self.symbol}_{self.interval}_{timestamp}.{self.output_format}"
     
     def __post_init__(self):
         if self.ema_periods is None:
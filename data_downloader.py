@@ -5,20 +5,52 @@ Data Downloader Module - Modular data fetching from Binance
 import pandas as pd
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Any
 
 # Add current directory to path to import binanceExc
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from binanceExc import Binance
+from archive_importer import KlineArchiveImporter
+from candle_store import CandleStore
+from candle_integrity import CandleValidator
+
+
+@dataclass
+class KlineJob:
+    """One symbol/interval/time range to download"""
+    
+    symbol: str
+    interval: str
+    start: Any = None
+    end: Any = None
+    limit: int = 1000
+
+
+@dataclass
+class KlineResult:
+    """Outcome of a KlineJob: data on success, error on failure"""
+    
+    job: KlineJob
+    data: Optional[pd.DataFrame] = None
+    error: Optional[Exception] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class DataDownloader:
     """Modular data downloader for trading data"""
     
-    def __init__(self):
+    def __init__(self, max_workers=8):
         self.exchange = Binance()
+        self.max_workers = max_workers
     
-    def download_data(self, symbol='BTCUSDT', interval='4h', limit=1000):
+    def download_data(self, symbol='BTCUSDT', interval='4h', limit=1000, archive_dir=None, store_dir=None,
+                      validate=True):
         """
         Download OHLCV data from Binance
         
@@ -26,15 +58,39 @@ class DataDownloader:
             symbol: Trading pair symbol
             interval: Time interval
             limit: Number of candles to download
+            archive_dir: Directory of Binance kline zip archives. When given,
+                         history is loaded from the archives and only the
+                         trailing gap is downloaded
+            store_dir: Root of a CandleStore. When given, the store is synced
+                       (only missing candles are downloaded) and read from
+                       disk; the still open candle is downloaded on top
+            validate: Check for duplicated, out of order and missing candles
+                      and download the missing spans
             
         Returns:
-            DataFrame with OHLCV data
+            DataFrame with int64 ms open 'time' and OHLCV data
         """
         
         print(f"Downloading {symbol} {interval} data...")
         
+        # Open time range of the last `limit` candles, for the store and archive paths
+        start = self.exchange.IntervalStart(interval, self.exchange._clock_ms(), limit)
+        
         # Download data
-        df = self.exchange.GetSymbolKlines(symbol, interval, limit=limit)
+        if store_dir:
+            store = CandleStore(store_dir, exchange=self.exchange)
+            store.sync(symbol, interval, start=start)
+            df = store.read(symbol, interval, start=start)
+            
+            # The store keeps closed candles only; add the open one like the REST path
+            after = int(df['time'].iloc[-1]) + 1 if len(df) else start
+            live = self.exchange.GetSymbolKlinesRange(symbol, interval, after)
+            df = pd.concat([df, live[df.columns.intersection(live.columns)]], ignore_index=True).tail(limit)
+        elif archive_dir:
+            importer = KlineArchiveImporter(archive_dir)
+            df = importer.load_and_top_up(self.exchange, symbol, interval, start=start).tail(limit)
+        else:
+            df = self.exchange.GetSymbolKlines(symbol, interval, limit=limit)
         
         if df.empty:
             print("Error: No data downloaded")
@@ -42,17 +98,18 @@ class DataDownloader:
         
         print(f"Downloaded {len(df)} candles")
         
-        # Format date for Label Studio
-        df['date'] = pd.to_datetime(df['time'], unit='ms')
-        df['date_str'] = df['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        if validate:
+            df, report = CandleValidator(self.exchange).validate(df, symbol, interval)
+            if not report.ok:
+                print(f"⚠️  {report.summary()}")
         
-        # Select and order columns
+        # Select and order columns (open times stay int64 ms; dates are only
+        # formatted by the Label Studio exporter)
         columns_for_export = [
-            'date_str', 'open', 'high', 'low', 'close', 'volume'
+            'time', 'open', 'high', 'low', 'close', 'volume'
         ]
         
         df_export = df[columns_for_export].copy()
-        df_export = df_export.rename(columns={'date_str': 'date'})  # type: ignore
         
         # Remove any rows with NaN values
         df_export = df_export.dropna()
@@ -60,6 +117,66 @@ class DataDownloader:
         print(f"Final dataset: {len(df_export)} rows")
         
         return df_export
+    
+    def download_many(self, jobs: Iterable, max_workers=None) -> Iterator[KlineResult]:
+        """
+        Download many symbol/interval/range jobs concurrently
+        
+        Args:
+            jobs: KlineJob instances or (symbol, interval, start, end) tuples.
+                  When start is None the last `limit` candles are downloaded.
+            max_workers: Number of parallel downloads (default: self.max_workers)
+            
+        Yields:
+            KlineResult for each job as soon as it completes. A failing job
+            yields a result with `error` set and does not stop the others.
+        """
+        
+        jobs = [job if isinstance(job, KlineJob) else KlineJob(*job) for job in jobs]
+        workers = max_workers or self.max_workers
+        
+        print(f"Downloading {len(jobs)} jobs with {workers} workers...")
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self._fetch_job, job): job for job in jobs}
+            
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    yield KlineResult(job=job, data=future.result())
+                except Exception as e:
+                    print(f"Error downloading {job.symbol} {job.interval}: {e}")
+                    yield KlineResult(job=job, error=e)
+    
+    def universe_jobs(self, quote_assets=None, intervals=None, start=None, end=None, limit=1000):
+        """
+        Build one KlineJob per tradable symbol and interval
+        
+        Args:
+            quote_assets: Quote assets of the universe (default: ['USDT'])
+            intervals: Intervals to download (default: ['1h', '4h'])
+            start, end: Time range, see Binance.GetSymbolKlinesRange
+            limit: Number of candles when no start is given
+        """
+        
+        quote_assets = quote_assets or ['USDT']
+        intervals = intervals or ['1h', '4h']
+        
+        symbols = self.exchange.GetTradingSymbols(quote_assets)
+        
+        return [
+            KlineJob(symbol, interval, start, end, limit)
+            for symbol in symbols
+            for interval in intervals
+        ]
+    
+    def _fetch_job(self, job: KlineJob) -> pd.DataFrame:
+        """Fetch the candles of a single job"""
+        
+        if job.start is None:
+            return self.exchange.GetSymbolKlines(job.symbol, job.interval, limit=job.limit)
+        
+        return self.exchange.GetSymbolKlinesRange(job.symbol, job.interval, job.start, job.end)
 
 
 # Singleton instance for easy access
@@ -0,0 +1,128 @@
+"""
+Dataset Catalog - Index of the datasets the pipeline has already produced
+
+Every pipeline request is reduced to a key: a SHA-256 digest of its symbol,
+interval, candle range (limit and open time of the current candle) and
+indicator parameters. The catalog (a small JSON file) maps each key to the
+file that was written for it, together with the SHA-256 of the file content,
+the request fields themselves and the open times of the first and last
+candle in the file, so entries can be searched and audited.
+
+A request whose key is in the catalog, with its file still on disk and
+unchanged, is answered from that file instead of downloading and
+recalculating. Files are named after the key, so re-running a request never
+adds a new copy to data/processed.
+
+    catalog = DatasetCatalog('data/catalog.json')
+    fields = dict(symbol='BTCUSDT', interval='4h', limit=1000, current_candle=..., params={...})
+    key = catalog.request_key(**fields)
+    entry = catalog.lookup(key)
+    ...
+    catalog.record(key, path, start=..., end=..., **fields)
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import structlog
+
+
+# Bump when the indicator code changes so older datasets are not reused
+CATALOG_VERSION = 2
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetCatalog:
+    """JSON index of materialized datasets keyed by request digest"""
+
+    def __init__(self, path='data/catalog.json'):
+        self.path = path
+        self.logger = structlog.get_logger(__name__)
+        self._entries = self._read()
+
+    @staticmethod
+    def request_key(**fields) -> str:
+        """Digest of a request's fields (any JSON-serializable values)"""
+        fields['catalog_version'] = CATALOG_VERSION
+        payload = json.dumps(fields, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def lookup(self, key):
+        """
+        Catalog entry of key, or None
+
+        Entries whose file was removed or modified since it was recorded are
+        dropped. The content is only re-hashed when the file's size or
+        modification time changed.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if not self._unchanged(entry):
+            self.logger.info(f"Catalog entry {key[:12]} is stale: {entry['path']}")
+            self.remove(key)
+            return None
+
+        return entry
+
+    def record(self, key, path, content_hash=None, **fields):
+        """Record the file written for key (fields are kept as metadata)"""
+        stat = os.stat(path)
+        entry = dict(fields, path=path, content_hash=content_hash or file_digest(path),
+                     size=stat.st_size, mtime_ns=stat.st_mtime_ns, created=time.time())
+        self._entries[key] = entry
+        self._write()
+        return entry
+
+    def remove(self, key):
+        if self._entries.pop(key, None) is not None:
+            self._write()
+
+    def find_content(self, content_hash):
+        """Entries whose file has the given content hash"""
+        return [entry for entry in self._entries.values() if entry['content_hash'] == content_hash]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @staticmethod
+    def _unchanged(entry):
+        try:
+            stat = os.stat(entry['path'])
+        except OSError:
+            return False
+
+        if stat.st_size == entry.get('size') and stat.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+        return file_digest(entry['path']) == entry['content_hash']
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+
+        with open(self.path, 'r') as f:
+            return json.load(f).get('datasets', {})
+
+    def _write(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CATALOG_VERSION, 'datasets': self._entries}, f, indent=1)
+        os.replace(tmp_path, self.path)
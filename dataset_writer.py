@@ -0,0 +1,191 @@
+"""
+Dataset Writer - Typed columnar output for the processed datasets
+
+The pipeline output is written by a DatasetWriter chosen by format name:
+
+    parquet   zstd-compressed Parquet, one row group per `row_group_size` rows (default)
+    feather   Arrow IPC file (Feather v2), one record batch per `row_group_size` rows
+    csv       plain CSV, kept for tools that need text
+
+Rows are converted to Arrow and written one row group at a time, so a large
+frame never becomes a single in-memory table or text buffer. Every writer
+writes to a temporary name and renames it into place.
+
+    writer = get_writer('parquet')
+    writer.write(df, 'data/processed/BTCUSDT_4h.parquet')
+    df = read_dataset('data/processed/BTCUSDT_4h.parquet')
+
+read_dated_frame() also reads the exports (.candles, Label Studio CSV) and
+indexes any of them by candle open date, as the visualizers need.
+
+link_latest() points a fixed name (e.g. data/exports/latest_dataset.parquet)
+at a dataset with an atomic symlink swap instead of writing another copy.
+"""
+
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from candle_file import CandleFile, is_candle_file
+
+
+class DatasetWriter:
+    """Writes a DataFrame to one file"""
+
+    extension = ''
+
+    def __init__(self, row_group_size=100_000):
+        self.row_group_size = row_group_size
+
+    def write(self, df, path):
+        """Write df to path atomically; returns path"""
+        tmp = f'{path}.tmp'
+        try:
+            self._write(df, tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return path
+
+    def read(self, path):
+        raise NotImplementedError
+
+    def _write(self, df, path):
+        raise NotImplementedError
+
+    def _schema(self, df):
+        # Inferred from the whole frame: a column that is empty in the first
+        # row group must not be typed null for the ones after it
+        return pa.Schema.from_pandas(df, preserve_index=False)
+
+    def _row_groups(self, df, schema):
+        for start in range(0, len(df), self.row_group_size):
+            chunk = df.iloc[start:start + self.row_group_size]
+            yield pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+
+class ParquetWriter(DatasetWriter):
+    """Compressed Parquet, streamed one row group at a time"""
+
+    extension = '.parquet'
+
+    def __init__(self, row_group_size=100_000, compression='zstd'):
+        super().__init__(row_group_size)
+        self.compression = compression
+
+    def _write(self, df, path):
+        schema = self._schema(df)
+        with pq.ParquetWriter(path, schema, compression=self.compression) as writer:
+            for table in self._row_groups(df, schema):
+                writer.write_table(table, row_group_size=self.row_group_size)
+
+    def read(self, path):
+        return pq.read_table(path).to_pandas()
+
+
+class FeatherWriter(DatasetWriter):
+    """Arrow IPC file (Feather v2), streamed one record batch at a time"""
+
+    extension = '.feather'
+
+    def __init__(self, row_group_size=100_000, compression='zstd'):
+        super().__init__(row_group_size)
+        self.compression = compression
+
+    def _write(self, df, path):
+        schema = self._schema(df)
+        options = ipc.IpcWriteOptions(compression=self.compression)
+        with pa.OSFile(path, 'wb') as sink, ipc.new_file(sink, schema, options=options) as writer:
+            for table in self._row_groups(df, schema):
+                writer.write_table(table)
+
+    def read(self, path):
+        with pa.memory_map(path) as source:
+            return ipc.open_file(source).read_all().to_pandas()
+
+
+class CsvWriter(DatasetWriter):
+    """Plain CSV, written in chunks of row_group_size rows"""
+
+    extension = '.csv'
+
+    def _write(self, df, path):
+        with open(path, 'w', newline='') as f:
+            for start in range(0, max(len(df), 1), self.row_group_size):
+                df.iloc[start:start + self.row_group_size].to_csv(f, index=False, header=start == 0)
+
+    def read(self, path):
+        return pd.read_csv(path)
+
+
+WRITERS = {
+    'parquet': ParquetWriter,
+    'feather': FeatherWriter,
+    'csv': CsvWriter,
+}
+
+
+def get_writer(fmt='parquet', **kwargs) -> DatasetWriter:
+    """Writer for a format name in WRITERS"""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format {fmt}, expected one of {list(WRITERS)}")
+    return WRITERS[fmt](**kwargs)
+
+
+def read_dataset(path):
+    """Read a dataset written by any writer, chosen by file extension"""
+    for writer in WRITERS.values():
+        if path.endswith(writer.extension):
+            return writer().read(path)
+    raise ValueError(f"Unknown dataset format: {path}")
+
+
+def read_dated_frame(path):
+    """
+    A dataset or export indexed by candle open date ('date')
+
+    .candles files are memory-mapped (no text or date parsing), Parquet and
+    Feather are read by read_dataset and any other file as CSV. The index
+    comes from the int64 ms 'time' column, or from the 'date' column of a
+    Label Studio export.
+    """
+    if is_candle_file(path):
+        return CandleFile(path).frame()
+
+    df = read_dataset(path) if path.endswith(('.parquet', '.feather')) else pd.read_csv(path)
+    if 'time' in df.columns:
+        df.index = pd.DatetimeIndex(df.pop('time').to_numpy(dtype='int64').view('datetime64[ms]'), name='date')
+    else:
+        df['date'] = pd.to_datetime(df['date'])
+        df.set_index('date', inplace=True)
+    return df
+
+
+def link_latest(target, link):
+    """
+    Atomically point link at target
+
+    A relative symlink is created under a temporary name and renamed over
+    link, so readers see either the old or the new dataset. Where symlinks are
+    not available a hard link is tried, then a copy.
+    """
+    directory = os.path.dirname(link) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    tmp = f'{link}.tmp'
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    try:
+        os.symlink(os.path.relpath(target, directory), tmp)
+    except (OSError, NotImplementedError):
+        try:
+            os.link(target, tmp)
+        except OSError:
+            shutil.copyfile(target, tmp)
+    os.replace(tmp, link)
+    return link
@@ -0,0 +1,325 @@
+"""
+Kline Stream - Live candles from Binance WebSocket streams
+
+Multiplexes the <symbol>@kline_<interval> and <symbol>@miniTicker streams of
+many symbols on one combined-stream connection and keeps a rolling candle
+buffer per symbol/interval, so fresh candles no longer require polling
+GetSymbolKlines. Every update is pushed to an optional callback and to the
+async iterator as soon as it arrives; `final` marks the update that closes a
+candle.
+
+    stream = KlineStream(klines=[('BTCUSDT', '1m'), ('ETHUSDT', '1m')], final_only=True)
+    stream.seed(Binance())
+
+    async for update in stream:
+        df = stream.buffers[(update.symbol, update.interval)].frame()
+        ...
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+
+import aiohttp
+import numpy as np
+import pandas as pd
+import structlog
+
+
+CANDLE_DTYPE = np.dtype([
+    ('time', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+    ('close_time', np.int64),
+    ('final', np.bool_),
+])
+
+
+@dataclass
+class CandleUpdate:
+    """One kline stream event"""
+    
+    symbol: str
+    interval: str
+    time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    close_time: int
+    final: bool
+    event_time: int
+
+
+@dataclass
+class TickerUpdate:
+    """One miniTicker stream event (rolling 24h window)"""
+    
+    symbol: str
+    close: float
+    open: float
+    high: float
+    low: float
+    volume: float
+    quote_volume: float
+    event_time: int
+
+
+class CandleBuffer:
+    """Rolling in-memory candles of one symbol/interval, newest last"""
+    
+    def __init__(self, symbol, interval, capacity=1000):
+        self.symbol = symbol
+        self.interval = interval
+        self.capacity = capacity
+        
+        # Twice the capacity so appends only compact once every `capacity` candles
+        self._data = np.zeros(2 * capacity, dtype=CANDLE_DTYPE)
+        self._start = 0
+        self._end = 0
+    
+    def __len__(self):
+        return self._end - self._start
+    
+    def update(self, update: CandleUpdate) -> bool:
+        """
+        Apply a stream update: replaces the open candle or appends a new one.
+        Updates older than the last candle are ignored. Returns True when the
+        update was applied.
+        """
+        if self._end > self._start:
+            last = self._data[self._end - 1]
+            if update.time < last['time']:
+                return False
+            if update.time == last['time']:
+                self._data[self._end - 1] = self._row(update)
+                return True
+        
+        if self._end == len(self._data):
+            keep = self.capacity - 1
+            self._data[:keep] = self._data[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        
+        self._data[self._end] = self._row(update)
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+        return True
+    
+    def seed(self, df):
+        """Fill the buffer from a GetSymbolKlines frame (its last candle may still be open)"""
+        df = df.tail(self.capacity)
+        n = len(df)
+        self._data[:n]['time'] = df['time'].to_numpy(dtype=np.int64)
+        for col in ('open', 'high', 'low', 'close', 'volume'):
+            self._data[:n][col] = df[col].to_numpy(dtype=np.float64)
+        if 'close_time' in df.columns:
+            self._data[:n]['close_time'] = df['close_time'].to_numpy(dtype=np.int64)
+            self._data[:n]['final'] = self._data[:n]['close_time'] < time.time() * 1000
+        else:
+            self._data[:n]['final'] = True
+        self._start, self._end = 0, n
+    
+    def view(self):
+        """Structured NumPy view of the buffered candles (no copy)"""
+        return self._data[self._start:self._end]
+    
+    def frame(self, final_only=False):
+        """Buffered candles as an OHLCV DataFrame"""
+        data = self.view()
+        if final_only:
+            data = data[data['final']]
+        df = pd.DataFrame({name: data[name] for name in CANDLE_DTYPE.names})
+        df['date'] = df['time'].to_numpy().astype('datetime64[ms]')
+        return df
+    
+    @staticmethod
+    def _row(update):
+        return (update.time, update.open, update.high, update.low, update.close, update.volume,
+                update.close_time, update.final)
+
+
+class KlineStream:
+    """Consumer of Binance combined kline/miniTicker WebSocket streams"""
+    
+    def __init__(self, klines=(), mini_tickers=(), base='wss://stream.binance.com:9443', capacity=1000,
+                 on_update=None, final_only=False, reconnect_delay=1.0):
+        """
+        Args:
+            klines: (symbol, interval) pairs to follow
+            mini_tickers: Symbols whose miniTicker stream to follow
+            base: WebSocket root URL (e.g. a local_binance_server.py ws_url)
+            capacity: Candles kept per symbol/interval
+            on_update: Callable (or coroutine function) receiving each update
+            final_only: Only deliver kline updates that close a candle
+            reconnect_delay: Initial delay before reconnecting, doubled per failure
+        """
+        self.logger = structlog.get_logger(__name__)
+        self.base = base
+        self.capacity = capacity
+        self.on_update = on_update
+        self.final_only = final_only
+        self.reconnect_delay = reconnect_delay
+        
+        self.buffers = {}
+        self.streams = set()
+        for symbol, interval in klines:
+            self._add_kline(symbol, interval)
+        for symbol in mini_tickers:
+            self.streams.add(f'{symbol.lower()}@miniTicker')
+        
+        self._ws = None
+        self._queue = None
+        self._task = None
+        self._running = False
+        self._next_id = 1
+    
+    @property
+    def url(self):
+        return f"{self.base}/stream?streams={'/'.join(sorted(self.streams))}"
+    
+    def seed(self, exchange, limit=None):
+        """Prefill every buffer with the last closed candles over REST"""
+        for (symbol, interval), buffer in self.buffers.items():
+            buffer.seed(exchange.GetSymbolKlines(symbol, interval, limit=limit or self.capacity))
+    
+    async def subscribe(self, symbol, interval=None):
+        """Follow one more kline (or miniTicker when interval is None) stream"""
+        name = self._add_kline(symbol, interval) if interval else f'{symbol.lower()}@miniTicker'
+        self.streams.add(name)
+        await self._send('SUBSCRIBE', [name])
+    
+    async def unsubscribe(self, symbol, interval=None):
+        name = f'{symbol.lower()}@kline_{interval}' if interval else f'{symbol.lower()}@miniTicker'
+        self.streams.discard(name)
+        await self._send('UNSUBSCRIBE', [name])
+    
+    async def run(self):
+        """
+        Consume the streams until stop(), reconnecting on failures. Malformed
+        frames are logged and skipped. An exception raised by on_update ends
+        the run; when iterating, it is re-raised by the async iterator.
+        """
+        self._running = True
+        delay = self.reconnect_delay
+        
+        try:
+            while self._running:
+                try:
+                    async with aiohttp.ClientSession() as session:
+                        async with session.ws_connect(self.url, heartbeat=30) as ws:
+                            self._ws = ws
+                            delay = self.reconnect_delay
+                            self.logger.info(f'Connected to {len(self.streams)} streams')
+                            
+                            async for msg in ws:
+                                if msg.type == aiohttp.WSMsgType.TEXT:
+                                    await self._handle(msg.data)
+                                elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self.logger.warning(f'Stream connection failed: {e}')
+                finally:
+                    self._ws = None
+                
+                if self._running:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 60)
+        except Exception as e:
+            self._running = False
+            self.logger.exception(f'Stream stopped by an update handler error: {e!r}')
+            if self._queue is None:
+                raise
+            self._queue.put_nowait(e)
+    
+    async def stop(self):
+        self._running = False
+        if self._ws is not None:
+            await self._ws.close()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._queue is not None:
+            self._queue.put_nowait(None)
+    
+    def __aiter__(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+        return self
+    
+    async def __anext__(self):
+        update = await self._queue.get()
+        if update is None:
+            raise StopAsyncIteration
+        if isinstance(update, Exception):
+            self._queue.put_nowait(None)
+            raise update
+        return update
+    
+    def _add_kline(self, symbol, interval):
+        key = (symbol.upper(), interval)
+        if key not in self.buffers:
+            self.buffers[key] = CandleBuffer(key[0], interval, self.capacity)
+        name = f'{symbol.lower()}@kline_{interval}'
+        self.streams.add(name)
+        return name
+    
+    async def _send(self, method, params):
+        if self._ws is None:
+            return
+        await self._ws.send_str(json.dumps({'method': method, 'params': params, 'id': self._next_id}))
+        self._next_id += 1
+    
+    async def _handle(self, text):
+        try:
+            update = self._parse(text)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.logger.warning(f'Skipping malformed stream frame ({e!r}): {text[:200]}')
+            return
+        if update is None:
+            return
+        
+        if isinstance(update, CandleUpdate):
+            buffer = self.buffers.get((update.symbol, update.interval))
+            if buffer is not None and not buffer.update(update):
+                return
+            if self.final_only and not update.final:
+                return
+        
+        if self.on_update is not None:
+            result = self.on_update(update)
+            if asyncio.iscoroutine(result):
+                await result
+        
+        if self._queue is not None:
+            self._queue.put_nowait(update)
+    
+    @staticmethod
+    def _parse(text):
+        """CandleUpdate or TickerUpdate of one combined stream frame (None for other messages)"""
+        message = json.loads(text)
+        data = message.get('data')
+        if data is None:
+            return None
+        
+        event = data.get('e')
+        if event == 'kline':
+            k = data['k']
+            return CandleUpdate(
+                symbol=k['s'], interval=k['i'], time=k['t'],
+                open=float(k['o']), high=float(k['h']), low=float(k['l']), close=float(k['c']),
+                volume=float(k['v']), close_time=k['T'], final=k['x'], event_time=data['E'],
+            )
+        if event == '24hrMiniTicker':
+            return TickerUpdate(
+                symbol=data['s'], close=float(data['c']), open=float(data['o']), high=float(data['h']),
+                low=float(data['l']), volume=float(data['v']), quote_volume=float(data['q']), event_time=data['E'],
+            )
+        return None
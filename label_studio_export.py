@@ -0,0 +1,29 @@
+"""
+Label Studio Export - CSV files for the TimeSeries labeling interface
+
+The pipeline carries candle open times as int64 ms in a 'time' column.
+Human-readable dates are only needed by Label Studio (label_studio_config.xml
+reads a 'date' column in DATE_FORMAT), so they are produced here, at write
+time: the open times are viewed as datetime64 and formatted by the CSV writer
+itself, without an intermediate column of Python strings.
+"""
+
+
+# Must match timeFormat in label_studio_config.xml
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def label_studio_frame(df):
+    """df with 'time' replaced by a leading datetime64 'date' column"""
+    out = df.drop(columns=['time', 'date'], errors='ignore')
+    out.insert(0, 'date', df['time'].to_numpy(dtype='int64').view('datetime64[ms]'))
+    return out
+
+
+def write_label_studio_csv(df, path, chunk_size=100_000):
+    """Write df (with an int64 ms 'time' column) as a Label Studio CSV, chunk_size rows at a time"""
+    with open(path, 'w', newline='') as f:
+        for start in range(0, max(len(df), 1), chunk_size):
+            chunk = label_studio_frame(df.iloc[start:start + chunk_size])
+            chunk.to_csv(f, index=False, header=start == 0, date_format=DATE_FORMAT)
+    return path
@@ -0,0 +1,58 @@
+"""
+Rolling Linear Regression - Pine Script ta.linreg over every window at once
+
+ta.linreg(source, length, offset) fits a least squares line to the last
+`length` values (x = 0 .. length-1) and returns its value at
+x = length - 1 - offset. For a fixed length that value is a fixed linear
+combination of the window:
+
+    linreg = sum(w[j] * y[j])    w[j] = 1/length + (j - x_mean) * (x_target - x_mean) / Sxx
+
+so the whole series is one correlation of the source with `length` weights
+derived from the normal equations. No per-window fit, and no running
+cumulative sums whose rounding error grows with the series length.
+
+    momentum = rolling_linreg(source, 20)    # == ta.linreg(source, 20, 0)
+"""
+
+import numpy as np
+
+
+def linreg_weights(length, offset=0):
+    """Weights w such that w @ window is the regression line at length - 1 - offset"""
+    x = np.arange(length, dtype=np.float64)
+    x_mean = x.mean()
+    centered = x - x_mean
+    target = length - 1 - offset
+    return 1.0 / length + centered * (target - x_mean) / (centered @ centered)
+
+
+def rolling_linreg(values, length, offset=0):
+    """
+    ta.linreg(values, length, offset) for every position
+
+    Args:
+        values: 1-D array-like of floats
+        length: Window length (>= 2)
+        offset: Pine offset (0 = value at the last bar of the window)
+
+    Returns:
+        float64 array like values; NaN for the first length-1 positions and
+        for every window that contains a NaN
+    """
+    if length < 2:
+        raise ValueError(f"linreg length must be at least 2, got {length}")
+
+    y = np.asarray(values, dtype=np.float64)
+    out = np.full(len(y), np.nan)
+    if len(y) < length:
+        return out
+
+    nan = np.isnan(y)
+    out[length - 1:] = np.correlate(np.where(nan, 0.0, y), linreg_weights(length, offset), mode='valid')
+
+    if nan.any():
+        nan_in_window = np.convolve(nan, np.ones(length, dtype=np.int64), mode='valid') > 0
+        out[length - 1:][nan_in_window] = np.nan
+
+    return out
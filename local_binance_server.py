@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Local Binance REST stand-in for offline load testing
+
+Serves the endpoints of binanceExc.ENDPOINTS with synthetic, deterministic
+data: the same request always returns the same candles, so clients, the bulk
+downloader and the pipeline can be exercised at thousands of requests per
+second without network access. Latency, error injection and the
+X-MBX-USED-WEIGHT-1m accounting (with 429 answers past the limit) are
+configurable.
+
+    with LocalBinanceServer(latency=0.005, error_rate=0.01) as server:
+        exchange = Binance(base=server.url)
+        df = exchange.GetSymbolKlinesRange('BTCUSDT', '1m', '2024-01-01', '2024-02-01')
+
+The /stream endpoint is a WebSocket stand-in for Binance combined streams
+(<symbol>@kline_<interval> and <symbol>@miniTicker). Candles advance on a
+simulated clock: every stream_period seconds each kline stream gets an
+update, and every updates_per_candle updates the candle closes (x=true).
+
+Or from the command line:
+
+    python local_binance_server.py --port 8080 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from binanceExc import ENDPOINTS, Binance, request_weight
+from resampler import candle_end_times, candle_open_times
+
+
+DEFAULT_SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT', 'XRPUSDT', 'ETHBTC', 'BNBBTC']
+
+WEEK_OFFSET_MS = 4 * 24 * 60 * 60 * 1000  # 1970-01-01 is a Thursday, weekly candles open on Monday
+
+
+def _unit_hash(values, seed):
+    """Deterministic uniform [0, 1) noise for every int64 value (splitmix64)"""
+    mix = (int(seed) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = np.asarray(values, dtype=np.int64).astype(np.uint64) + np.uint64(mix)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+class SyntheticMarket:
+    """Deterministic prices, candles and order books for a set of symbols"""
+    
+    # Formatted kline pages kept in memory (least recently used are dropped)
+    PAGE_CACHE_SIZE = 256
+    
+    def __init__(self, symbols=None):
+        self.symbols = list(symbols or DEFAULT_SYMBOLS)
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()
+    
+    def seed(self, symbol):
+        return zlib.crc32(symbol.encode())
+    
+    def base_price(self, symbol):
+        seed = self.seed(symbol)
+        return 10.0 ** (seed % 5) * (1 + (seed % 100) / 100)
+    
+    def price(self, symbol, times):
+        """Price at each ms timestamp: slow cycles plus per-minute noise"""
+        times = np.asarray(times, dtype=np.int64)
+        seed = self.seed(symbol)
+        t = times.astype(np.float64)
+        cycle = 0.2 * np.sin(2 * np.pi * t / 2.592e9 + seed % 7) + 0.05 * np.sin(2 * np.pi * t / 8.64e7 + seed % 3)
+        noise = 0.01 * (_unit_hash(times // 60000, seed) - 0.5)
+        return self.base_price(symbol) * np.exp(cycle + noise)
+    
+    def open_times(self, interval, start=None, end=None, limit=500):
+        """Open times Binance would return for these klines parameters"""
+        now = int(time.time() * 1000)
+        end = now if end is None else min(int(end), now)
+        
+        if interval == '1M':
+            last = pd.Timestamp(end, unit='ms').to_period('M').to_timestamp()
+            if start is None:
+                first = last - pd.DateOffset(months=limit - 1)
+            else:
+                requested = pd.Timestamp(int(start), unit='ms')
+                first = requested.to_period('M').to_timestamp()
+                if first < requested:
+                    first = first + pd.DateOffset(months=1)
+            months = pd.date_range(first, last, freq='MS')[:limit]
+            return ((months - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64)
+        
+        step = Binance.INTERVAL_MS[interval]
+        offset = WEEK_OFFSET_MS if interval == '1w' else 0
+        last = (end - offset) // step * step + offset
+        
+        if start is None:
+            first = last - (limit - 1) * step
+        else:
+            first = -((offset - int(start)) // step) * step + offset
+        
+        if first > last:
+            return np.empty(0, dtype=np.int64)
+        
+        count = min(limit, (last - first) // step + 1)
+        return first + np.arange(count, dtype=np.int64) * step
+    
+    def klines(self, symbol, interval, start=None, end=None, limit=500):
+        return self.kline_rows(symbol, interval, self.open_times(interval, start, end, limit))
+    
+    def kline_rows(self, symbol, interval, opens):
+        """
+        Binance kline rows for the given open times. Candles only depend on
+        their open time, so formatted pages are cached (callers must not
+        modify the returned rows).
+        """
+        opens = np.asarray(opens, dtype=np.int64)
+        if len(opens) == 0:
+            return []
+        
+        key = (symbol, interval, opens.tobytes())
+        with self._lock:
+            rows = self._pages.get(key)
+            if rows is not None:
+                self._pages.move_to_end(key)
+                return rows
+        
+        rows = self._format_klines(symbol, interval, opens)
+        with self._lock:
+            self._pages[key] = rows
+            if len(self._pages) > self.PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return rows
+    
+    def _format_klines(self, symbol, interval, opens):
+        if interval == '1M':
+            nxt = pd.to_datetime(opens, unit='ms') + pd.DateOffset(months=1)
+            closes = ((nxt - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64) - 1
+        else:
+            closes = opens + Binance.INTERVAL_MS[interval] - 1
+        
+        seed = self.seed(symbol)
+        o = self.price(symbol, opens)
+        c = self.price(symbol, closes + 1)
+        h = np.maximum(o, c) * (1 + 0.005 * _unit_hash(opens, seed + 1))
+        l = np.minimum(o, c) * (1 - 0.005 * _unit_hash(opens, seed + 2))
+        minutes = (closes + 1 - opens) / 60000
+        v = 100 * (0.5 + _unit_hash(opens, seed + 3)) * np.sqrt(minutes)
+        trades = (v * 3).astype(np.int64)
+        taker = v * _unit_hash(opens, seed + 4)
+        
+        # Formatted a column at a time, then zipped into rows
+        text = [['%.8f' % x for x in column.tolist()] for column in (o, h, l, c, v, v * c, taker, taker * c)]
+        return [
+            [t, o_, h_, l_, c_, v_, ct, q, n, tb, tq, '0']
+            for t, o_, h_, l_, c_, v_, ct, q, n, tb, tq in zip(
+                opens.tolist(), *text[:5], closes.tolist(), text[5], trades.tolist(), text[6], text[7])
+        ]
+    
+    TRADE_SPACING_MS = 100
+    
+    def agg_trades(self, symbol, from_id=None, start=None, end=None, limit=500):
+        """One synthetic aggregated trade every TRADE_SPACING_MS, id = time / spacing"""
+        spacing = self.TRADE_SPACING_MS
+        last_id = int(time.time() * 1000) // spacing
+        
+        if from_id is not None:
+            first = int(from_id)
+        elif start is not None:
+            first = -(-int(start) // spacing)
+        elif end is not None:
+            first = int(end) // spacing - limit + 1
+        else:
+            first = last_id - limit + 1
+        if end is not None:
+            last_id = min(last_id, int(end) // spacing)
+        
+        ids = np.arange(first, min(first + limit - 1, last_id) + 1, dtype=np.int64)
+        times = ids * spacing
+        seed = self.seed(symbol)
+        prices = self.price(symbol, times)
+        qtys = 0.001 + _unit_hash(ids, seed + 5) * 0.5
+        makers = _unit_hash(ids, seed + 6) < 0.5
+        
+        return [
+            {'a': int(ids[i]), 'p': f'{prices[i]:.8f}', 'q': f'{qtys[i]:.8f}', 'f': int(ids[i]) * 3,
+             'l': int(ids[i]) * 3 + 2, 'T': int(times[i]), 'm': bool(makers[i]), 'M': True}
+            for i in range(len(ids))
+        ]
+    
+    def last_price(self, symbol):
+        return float(self.price(symbol, [int(time.time() * 1000)])[0])
+    
+    def depth(self, symbol, limit=100):
+        mid = self.last_price(symbol)
+        tick = mid * 1e-5
+        levels = np.arange(1, limit + 1)
+        qty = 1 + 10 * _unit_hash(levels, self.seed(symbol))
+        bids = [[f'{mid - tick * i:.8f}', f'{q:.8f}'] for i, q in zip(levels, qty)]
+        asks = [[f'{mid + tick * i:.8f}', f'{q:.8f}'] for i, q in zip(levels, qty)]
+        return {'lastUpdateId': int(time.time() * 1000), 'bids': bids, 'asks': asks}
+    
+    def exchange_info(self):
+        symbols = []
+        for symbol in self.symbols:
+            quote = 'USDT' if symbol.endswith('USDT') else symbol[-3:]
+            symbols.append({
+                'symbol': symbol,
+                'status': 'TRADING',
+                'baseAsset': symbol[:-len(quote)],
+                'quoteAsset': quote,
+                'filters': [
+                    {'filterType': 'PRICE_FILTER', 'minPrice': '0.00000100', 'maxPrice': '1000000.00000000', 'tickSize': '0.00000100'},
+                    {'filterType': 'LOT_SIZE', 'minQty': '0.00001000', 'maxQty': '9000.00000000', 'stepSize': '0.00001000'},
+                    {'filterType': 'MIN_NOTIONAL', 'minNotional': '5.00000000', 'applyToMarket': True, 'avgPriceMins': 5},
+                ],
+            })
+        return {'timezone': 'UTC', 'serverTime': int(time.time() * 1000), 'rateLimits': [], 'symbols': symbols}
+    
+    def ticker_24hr(self, symbol):
+        now = int(time.time() * 1000)
+        last = self.last_price(symbol)
+        open_price = float(self.price(symbol, [now - 86400000])[0])
+        return {
+            'symbol': symbol,
+            'priceChange': f'{last - open_price:.8f}',
+            'priceChangePercent': f'{(last / open_price - 1) * 100:.3f}',
+            'openPrice': f'{open_price:.8f}',
+            'lastPrice': f'{last:.8f}',
+            'volume': f'{100 * 24 * 60:.8f}',
+            'openTime': now - 86400000,
+            'closeTime': now,
+        }
+    
+    def book_ticker(self, symbol):
+        book = self.depth(symbol, 1)
+        return {
+            'symbol': symbol,
+            'bidPrice': book['bids'][0][0], 'bidQty': book['bids'][0][1],
+            'askPrice': book['asks'][0][0], 'askQty': book['asks'][0][1],
+        }
+
+
+class LocalBinanceServer:
+    """aiohttp server implementing the Binance endpoints over SyntheticMarket"""
+    
+    def __init__(self, host='127.0.0.1', port=0, symbols=None, latency=0.0, latency_jitter=0.0,
+                 error_rate=0.0, error_status=500, weight_limit=6000, seed=0,
+                 stream_period=0.05, updates_per_candle=4):
+        """
+        Args:
+            host, port: Address to bind (port 0 picks a free port)
+            symbols: Symbols listed by exchangeInfo (default: DEFAULT_SYMBOLS)
+            latency: Seconds added to every response
+            latency_jitter: Extra uniform random latency in seconds
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status of injected errors (e.g. 500, 429, 418)
+            weight_limit: Used weight per minute above which requests get a 429
+            seed: Seed of the latency and error injection random generator
+            stream_period: Seconds between WebSocket stream updates
+            updates_per_candle: Stream updates per candle, the last one final
+        """
+        self.host = host
+        self.port = port
+        self.market = SyntheticMarket(symbols)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.weight_limit = weight_limit
+        self.endpoints = dict(ENDPOINTS)
+        self.stream_period = stream_period
+        self.updates_per_candle = updates_per_candle
+        
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._window = 0
+        self._used = 0
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._started = threading.Event()
+    
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}'
+    
+    @property
+    def ws_url(self):
+        return f'ws://{self.host}:{self.port}'
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def app(self):
+        app = web.Application()
+        routes = {
+            'serverTime': self.server_time,
+            'klines': self.klines,
+            'exchangeInfo': self.exchange_info,
+            '24hrTicker': self.ticker_24hr,
+            'averagePrice': self.average_price,
+            'price': self.price,
+            'orderBook': self.order_book,
+            'bestPQOrderBook': self.book_ticker,
+            'aggTrades': self.agg_trades,
+        }
+        for name, handler in routes.items():
+            app.router.add_get(self.endpoints[name], self._wrap(handler))
+        app.router.add_get('/stream', self.stream)
+        app.router.add_get('/ws', self.stream)
+        return app
+    
+    def start(self):
+        """Run the server on a background thread"""
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._started.wait()
+    
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+    
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._start_site())
+        self._started.set()
+        self._loop.run_forever()
+        self._loop.close()
+    
+    async def _start_site(self):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+    
+    def _wrap(self, handler):
+        async def wrapped(request):
+            self.requests += 1
+            
+            delay = self.latency + self._random.uniform(0, self.latency_jitter)
+            if delay:
+                await asyncio.sleep(delay)
+            
+            params = dict(request.query)
+            used = self._use_weight(request_weight(str(request.url), params, self.endpoints))
+            headers = {'X-MBX-USED-WEIGHT-1m': str(used)}
+            
+            if used > self.weight_limit:
+                headers['Retry-After'] = str(int(60 - time.time() % 60) + 1)
+                return self._json({'code': -1003, 'msg': 'Too much request weight used.'}, 429, headers)
+            
+            if self.error_rate and self._random.random() < self.error_rate:
+                if self.error_status in (429, 418):
+                    headers['Retry-After'] = '1'
+                return self._json({'code': -1000, 'msg': 'Injected error.'}, self.error_status, headers)
+            
+            try:
+                return self._json(handler(params), 200, headers)
+            except (KeyError, ValueError) as e:
+                return self._json({'code': -1100, 'msg': f'Illegal parameters: {e}'}, 400, headers)
+        
+        return wrapped
+    
+    def _use_weight(self, weight):
+        window = int(time.time() // 60)
+        if window != self._window:
+            self._window = window
+            self._used = 0
+        self._used += weight
+        return self._used
+    
+    @staticmethod
+    def _json(data, status, headers):
+        return web.Response(text=json.dumps(data), status=status, headers=headers, content_type='application/json')
+    
+    def _symbol(self, params):
+        symbol = params['symbol']
+        if symbol not in self.market.symbols:
+            raise ValueError(f'Invalid symbol {symbol}')
+        return symbol
+    
+    def _symbols(self, params):
+        """Symbols selected by symbol=, symbols=[...] or all of them"""
+        if 'symbol' in params:
+            return [self._symbol(params)], True
+        if 'symbols' in params:
+            return [self._symbol({'symbol': s}) for s in json.loads(params['symbols'])], False
+        return self.market.symbols, False
+    
+    # WebSocket streams
+    async def stream(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        
+        streams = set(filter(None, request.query.get('streams', '').split('/')))
+        clocks = {}
+        
+        async def control():
+            async for msg in ws:
+                if msg.type != web.WSMsgType.TEXT:
+                    continue
+                command = json.loads(msg.data)
+                if command.get('method') == 'SUBSCRIBE':
+                    streams.update(command['params'])
+                elif command.get('method') == 'UNSUBSCRIBE':
+                    streams.difference_update(command['params'])
+                await ws.send_str(json.dumps({'result': None, 'id': command.get('id')}))
+        
+        reader = asyncio.ensure_future(control())
+        try:
+            while not ws.closed and not reader.done():
+                for name in list(streams):
+                    event = self._stream_event(name, clocks)
+                    if event is not None:
+                        await ws.send_str(json.dumps({'stream': name, 'data': event}))
+                await asyncio.sleep(self.stream_period)
+        except ConnectionResetError:
+            pass
+        finally:
+            reader.cancel()
+        
+        return ws
+    
+    def _stream_event(self, name, clocks):
+        """Next event of one stream; kline candles advance on a simulated clock"""
+        symbol, _, kind = name.partition('@')
+        symbol = symbol.upper()
+        if symbol not in self.market.symbols:
+            return None
+        now = int(time.time() * 1000)
+        
+        if kind == 'miniTicker':
+            ticker = self.market.ticker_24hr(symbol)
+            return {'e': '24hrMiniTicker', 'E': now, 's': symbol, 'c': ticker['lastPrice'], 'o': ticker['openPrice'],
+                    'h': ticker['lastPrice'], 'l': ticker['lastPrice'], 'v': ticker['volume'], 'q': ticker['volume']}
+        
+        if not kind.startswith('kline_'):
+            return None
+        interval = kind[len('kline_'):]
+        if interval not in Binance.KLINE_INTERVALS:
+            return None
+        
+        if name not in clocks:
+            clocks[name] = [int(candle_open_times([now], interval)[0]), 0]
+        clock = clocks[name]
+        clock[1] += 1
+        
+        row = self.market.kline_rows(symbol, interval, [clock[0]])[0]
+        fraction = clock[1] / self.updates_per_candle
+        o, h, l, c, v = (float(x) for x in row[1:6])
+        c = o + (c - o) * fraction
+        final = clock[1] >= self.updates_per_candle
+        
+        event = {'e': 'kline', 'E': now, 's': symbol, 'k': {
+            't': row[0], 'T': row[6], 's': symbol, 'i': interval,
+            'o': row[1], 'c': f'{c:.8f}', 'h': f'{max(o, c) if not final else h:.8f}',
+            'l': f'{min(o, c) if not final else l:.8f}', 'v': f'{v * fraction:.8f}',
+            'n': int(row[8] * fraction), 'x': final, 'q': row[7], 'V': row[9], 'Q': row[10],
+        }}
+        
+        if final:
+            clock[0] = int(candle_end_times([clock[0]], interval)[0])
+            clock[1] = 0
+        
+        return event
+    
+    # Endpoints
+    def server_time(self, params):
+        return {'serverTime': int(time.time() * 1000)}
+    
+    def klines(self, params):
+        interval = params['interval']
+        if interval not in Binance.KLINE_INTERVALS:
+            raise ValueError(f'Invalid interval {interval}')
+        limit = min(int(params.get('limit', 500)), 1000)
+        return self.market.klines(self._symbol(params), interval, params.get('startTime'), params.get('endTime'), limit)
+    
+    def exchange_info(self, params):
+        return self.market.exchange_info()
+    
+    def ticker_24hr(self, params):
+        symbols, single = self._symbols(params)
+        data = [self.market.ticker_24hr(s) for s in symbols]
+        return data[0] if single else data
+    
+    def average_price(self, params):
+        return {'mins': 5, 'price': f'{self.market.last_price(self._symbol(params)):.8f}'}
+    
+    def price(self, params):
+        symbols, single = self._symbols(params)
+        data = [{'symbol': s, 'price': f'{self.market.last_price(s):.8f}'} for s in symbols]
+        return data[0] if single else data
+    
+    def order_book(self, params):
+        return self.market.depth(self._symbol(params), min(int(params.get('limit', 100)), 5000))
+    
+    def agg_trades(self, params):
+        start, end = params.get('startTime'), params.get('endTime')
+        if start is not None and end is not None and int(end) - int(start) > 3600000:
+            raise ValueError('startTime and endTime must be within 1 hour')
+        limit = min(int(params.get('limit', 500)), 1000)
+        return self.market.agg_trades(self._symbol(params), params.get('fromId'), start, end, limit)
+    
+    def book_ticker(self, params):
+        symbols, single = self._symbols(params)
+        data = [self.market.book_ticker(s) for s in symbols]
+        return data[0] if single else data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Binance REST stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='Extra random latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=500, help='HTTP status of injected errors')
+    parser.add_argument('--weight-limit', type=int, default=6000, help='Request weight per minute before 429')
+    parser.add_argument('--symbols', nargs='*', help='Symbols to list (default: a few majors)')
+    
+    args = parser.parse_args()
+    
+    server = LocalBinanceServer(
+        host=args.host, port=args.port, symbols=args.symbols,
+        latency=args.latency, latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate, error_status=args.error_status,
+        weight_limit=args.weight_limit
+    )
+    print(f"Serving synthetic Binance API on http://{args.host}:{args.port}")
+    web.run_app(server.app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Local Order Book - Depth maintained from one snapshot plus diff updates
+
+Follows the Binance procedure for a local order book: buffer the
+<symbol>@depth stream events, seed from a /api/v3/depth snapshot, drop the
+events already contained in it and apply the rest in update-id order. A gap
+in the update ids means the book is out of sync and must be re-seeded.
+
+Each side is kept in preallocated NumPy arrays sorted from the best level
+outwards, so best bid/ask, depth-at-N and cumulative volume queries are
+array slices instead of REST round-trips.
+
+    book = LocalOrderBook('BTCUSDT')
+    for event in buffered_events:
+        book.apply(event)
+    book.seed(exchange.GetOrderBook('BTCUSDT', 1000))
+    ...
+    book.apply(event)          # for each new depthUpdate event
+    book.best_bid(), book.best_ask(), book.depth(10)
+"""
+
+import numpy as np
+import structlog
+
+
+class OutOfSyncError(Exception):
+    """Raised when a depth update does not follow the last applied update id"""
+
+
+class BookSide:
+    """One side of the book: price levels sorted from best to worst"""
+    
+    def __init__(self, descending, capacity=5000):
+        self.descending = descending
+        self.capacity = capacity
+        
+        # Levels are searched by key: -price for bids so both sides sort ascending
+        self._keys = np.empty(capacity, dtype=np.float64)
+        self.prices = np.empty(capacity, dtype=np.float64)
+        self.qtys = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def clear(self):
+        self.size = 0
+    
+    def load(self, levels):
+        """Replace the side with [[price, qty], ...] levels (strings or numbers)"""
+        levels = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+        levels = levels[levels[:, 1] > 0]
+        keys = -levels[:, 0] if self.descending else levels[:, 0]
+        order = np.argsort(keys, kind='stable')[:self.capacity]
+        n = len(order)
+        
+        self._keys[:n] = keys[order]
+        self.prices[:n] = levels[order, 0]
+        self.qtys[:n] = levels[order, 1]
+        self.size = n
+    
+    def update(self, levels):
+        """Apply [[price, qty], ...] changes; qty 0 removes the level"""
+        for price, qty in np.asarray(levels, dtype=np.float64).reshape(-1, 2):
+            key = -price if self.descending else price
+            n = self.size
+            i = np.searchsorted(self._keys[:n], key)
+            
+            if i < n and self._keys[i] == key:
+                if qty > 0:
+                    self.qtys[i] = qty
+                else:
+                    self._shift_left(i)
+            elif qty > 0:
+                if n == self.capacity:
+                    if i == n:
+                        continue
+                    n = self.size = n - 1
+                self._shift_right(i)
+                self._keys[i] = key
+                self.prices[i] = price
+                self.qtys[i] = qty
+    
+    def _shift_left(self, i):
+        n = self.size
+        for arr in (self._keys, self.prices, self.qtys):
+            arr[i:n - 1] = arr[i + 1:n]
+        self.size = n - 1
+    
+    def _shift_right(self, i):
+        n = self.size
+        for arr in (self._keys, self.prices, self.qtys):
+            arr[i + 1:n + 1] = arr[i:n]
+        self.size = n + 1
+
+
+class LocalOrderBook:
+    """Order book of one symbol kept in sync from depth diff events"""
+    
+    def __init__(self, symbol, capacity=5000):
+        self.symbol = symbol
+        self.logger = structlog.get_logger(__name__)
+        
+        self.bids = BookSide(descending=True, capacity=capacity)
+        self.asks = BookSide(descending=False, capacity=capacity)
+        self.last_update_id = None
+        self._pending = []
+        
+        # The first event after the snapshot may start before it (U <= lastUpdateId + 1 <= u)
+        self._spanning = False
+    
+    @property
+    def synced(self):
+        return self.last_update_id is not None
+    
+    def seed(self, snapshot):
+        """
+        Load a /api/v3/depth snapshot and apply the events buffered before it.
+        Raises OutOfSyncError when the buffered events do not connect to the
+        snapshot (fetch a newer snapshot and seed again).
+        """
+        self.bids.load(snapshot['bids'])
+        self.asks.load(snapshot['asks'])
+        self.last_update_id = snapshot['lastUpdateId']
+        self._spanning = True
+        
+        pending, self._pending = self._pending, []
+        for event in pending:
+            if event['u'] > self.last_update_id:
+                self._apply(event)
+    
+    def apply(self, event):
+        """
+        Apply one depthUpdate event ({'U', 'u', 'b', 'a'}). Events received
+        before seed() are buffered. Raises OutOfSyncError on a sequence gap,
+        after which the book must be seeded again.
+        """
+        if not self.synced:
+            self._pending.append(event)
+            return
+        
+        if event['u'] <= self.last_update_id:
+            return
+        self._apply(event)
+    
+    def reset(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.last_update_id = None
+        self._pending = []
+        self._spanning = False
+    
+    def _apply(self, event):
+        """Apply an event with u > last_update_id, checking that it follows the last one"""
+        expected = self.last_update_id + 1
+        if self._spanning and event['U'] > expected:
+            snapshot = self.last_update_id
+            self.reset()
+            raise OutOfSyncError(f"{self.symbol}: snapshot {snapshot} older than update {event['U']}")
+        if not self._spanning and event['U'] != expected:
+            self.reset()
+            raise OutOfSyncError(f"{self.symbol}: expected update {expected}, got {event['U']}")
+        
+        self.bids.update(event['b'])
+        self.asks.update(event['a'])
+        self.last_update_id = event['u']
+        self._spanning = False
+    
+    # Queries
+    def best_bid(self):
+        """(price, qty) of the best bid, or None when the side is empty"""
+        return (self.bids.prices[0], self.bids.qtys[0]) if self.bids.size else None
+    
+    def best_ask(self):
+        return (self.asks.prices[0], self.asks.qtys[0]) if self.asks.size else None
+    
+    def mid_price(self):
+        return (self.bids.prices[0] + self.asks.prices[0]) / 2 if self.bids.size and self.asks.size else None
+    
+    def spread(self):
+        return self.asks.prices[0] - self.bids.prices[0] if self.bids.size and self.asks.size else None
+    
+    def depth(self, n=10):
+        """Top n levels as views: (bid_prices, bid_qtys, ask_prices, ask_qtys)"""
+        nb = min(n, self.bids.size)
+        na = min(n, self.asks.size)
+        return self.bids.prices[:nb], self.bids.qtys[:nb], self.asks.prices[:na], self.asks.qtys[:na]
+    
+    def cumulative_volume(self, n=10):
+        """Cumulative quantity of the top n levels: (bids, asks)"""
+        _, bid_qtys, _, ask_qtys = self.depth(n)
+        return np.cumsum(bid_qtys), np.cumsum(ask_qtys)
+    
+    def volume_within(self, price):
+        """Quantity resting between the best level and price on its side"""
+        if self.bids.size and price <= self.bids.prices[0]:
+            i = np.searchsorted(self.bids._keys[:self.bids.size], -price, side='right')
+            return float(self.bids.qtys[:i].sum())
+        if self.asks.size and price >= self.asks.prices[0]:
+            i = np.searchsorted(self.asks._keys[:self.asks.size], price, side='right')
+            return float(self.asks.qtys[:i].sum())
+        return 0.0
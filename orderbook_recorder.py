@@ -0,0 +1,227 @@
+"""
+Order Book Recorder - Compact append-only log of depth snapshots
+
+Snapshots of the top `depth` levels are appended to one binary file per
+column and per UTC day:
+
+    <root>/<SYMBOL>/<YYYY-MM-DD>/ts.bin        int64 ms timestamps
+                                 bid_px.bin    int64 prices * 10**price_decimals, depth per row
+                                 bid_qty.bin   int64 quantities * 10**qty_decimals
+                                 ask_px.bin
+                                 ask_qty.bin
+                                 meta.json     depth and scales
+
+Missing levels (books shallower than depth) are stored as 0. OrderBookLog
+memory-maps the day files and slices any time range without parsing text.
+
+    recorder = OrderBookRecorder('data/orderbooks', depth=20)
+    recorder.run(Binance(), ['BTCUSDT', 'ETHUSDT'], every=5)
+
+    log = OrderBookLog('data/orderbooks', 'BTCUSDT')
+    snap = log.read('2024-05-01', '2024-05-02')
+    snap['bid_px'][:, 0]    # best bid of every snapshot
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import structlog
+
+
+COLUMNS = ('bid_px', 'bid_qty', 'ask_px', 'ask_qty')
+
+# Scaled values must stay below 2**63 (exactly representable as a float)
+INT64_LIMIT = float(2 ** 63)
+
+
+class OrderBookRecorder:
+    """Appends order book snapshots to daily columnar files"""
+    
+    # Depth limits accepted by /api/v3/depth
+    SNAPSHOT_LIMITS = (5, 10, 20, 50, 100, 500, 1000, 5000)
+    
+    def __init__(self, root='data/orderbooks', depth=20, price_decimals=8, qty_decimals=8):
+        if not 0 < depth <= self.SNAPSHOT_LIMITS[-1]:
+            raise ValueError(f"depth must be between 1 and {self.SNAPSHOT_LIMITS[-1]}, got {depth}")
+        
+        self.root = root
+        self.depth = depth
+        self.price_decimals = price_decimals
+        self.qty_decimals = qty_decimals
+        self.logger = structlog.get_logger(__name__)
+        
+        self._files = {}
+    
+    def record(self, symbol, book, ts=None):
+        """
+        Append one snapshot. book is a /api/v3/depth answer ({'bids', 'asks'})
+        or an order_book.LocalOrderBook. ts defaults to now (ms). Raises
+        ValueError, without writing anything, when a price or quantity is not
+        finite or overflows int64 once scaled.
+        """
+        ts = int(time.time() * 1000) if ts is None else int(ts)
+        
+        if hasattr(book, 'depth'):
+            bid_px, bid_qty, ask_px, ask_qty = book.depth(self.depth)
+            bids = np.column_stack([bid_px, bid_qty])
+            asks = np.column_stack([ask_px, ask_qty])
+        else:
+            bids = np.asarray(book['bids'][:self.depth], dtype=np.float64).reshape(-1, 2)
+            asks = np.asarray(book['asks'][:self.depth], dtype=np.float64).reshape(-1, 2)
+        
+        # Scale every column before writing any, so a bad snapshot leaves no partial row
+        rows = {}
+        for (column, values) in zip(COLUMNS, (bids[:, 0], bids[:, 1], asks[:, 0], asks[:, 1])):
+            decimals = self.price_decimals if column.endswith('px') else self.qty_decimals
+            scaled = np.rint(values * 10 ** decimals)
+            if not np.all(np.abs(scaled) < INT64_LIMIT):
+                raise ValueError(f"{symbol} {column} does not fit int64 with {decimals} decimals: "
+                                 f"{float(values[~(np.abs(scaled) < INT64_LIMIT)][0])}")
+            rows[column] = np.zeros(self.depth, dtype=np.int64)
+            rows[column][:len(values)] = scaled
+        
+        files = self._day_files(symbol, ts)
+        files['ts'].write(np.int64(ts).tobytes())
+        for column, row in rows.items():
+            files[column].write(row.tobytes())
+        
+        for f in files.values():
+            f.flush()
+    
+    def run(self, exchange, symbols, every=5.0, duration=None):
+        """Snapshot every symbol over REST each `every` seconds until duration elapses"""
+        limit = next(l for l in self.SNAPSHOT_LIMITS if l >= self.depth)
+        started = time.time()
+        
+        try:
+            while duration is None or time.time() - started < duration:
+                tick = time.time()
+                for symbol in symbols:
+                    book = exchange.GetOrderBook(symbol, limit)
+                    if 'code' in book:
+                        self.logger.warning(f"Order book snapshot failed for {symbol}: {book.get('msg')}")
+                        continue
+                    try:
+                        self.record(symbol, book)
+                    except ValueError as e:
+                        self.logger.warning(f"Skipping order book snapshot of {symbol}: {e}")
+                time.sleep(max(0.0, every - (time.time() - tick)))
+        finally:
+            self.close()
+    
+    def close(self):
+        for files in self._files.values():
+            for f in files.values():
+                f.close()
+        self._files = {}
+    
+    def _day_files(self, symbol, ts):
+        day = pd.Timestamp(ts, unit='ms').strftime('%Y-%m-%d')
+        key = (symbol, day)
+        if key in self._files:
+            return self._files[key]
+        
+        # Rotate: close the previous day of this symbol
+        for old in [k for k in self._files if k[0] == symbol]:
+            for f in self._files.pop(old).values():
+                f.close()
+        
+        directory = os.path.join(self.root, symbol, day)
+        os.makedirs(directory, exist_ok=True)
+        
+        meta_path = os.path.join(directory, 'meta.json')
+        meta = {'depth': self.depth, 'price_decimals': self.price_decimals, 'qty_decimals': self.qty_decimals}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                existing = json.load(f)
+            if existing != meta:
+                raise ValueError(f"{directory} was recorded with {existing}, recorder uses {meta}")
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+        
+        files = {name: open(os.path.join(directory, f'{name}.bin'), 'ab') for name in ('ts',) + COLUMNS}
+        self._files[key] = files
+        return files
+
+
+class OrderBookLog:
+    """Memory-mapped reader of the snapshots recorded for one symbol"""
+    
+    def __init__(self, root, symbol):
+        self.root = root
+        self.symbol = symbol
+    
+    def days(self):
+        directory = os.path.join(self.root, self.symbol)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(d for d in os.listdir(directory) if os.path.exists(os.path.join(directory, d, 'meta.json')))
+    
+    def open_day(self, day):
+        """Memory-mapped columns of one day; rows written partially are ignored"""
+        directory = os.path.join(self.root, self.symbol, day)
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        depth = meta['depth']
+        
+        columns = {'ts': self._map(os.path.join(directory, 'ts.bin'), 1)}
+        for column in COLUMNS:
+            columns[column] = self._map(os.path.join(directory, f'{column}.bin'), depth)
+        
+        rows = min(len(values) for values in columns.values())
+        columns = {name: values[:rows] for name, values in columns.items()}
+        columns['ts'] = columns['ts'].reshape(-1)
+        return columns, meta
+    
+    def read(self, start=None, end=None, scaled=True):
+        """
+        Snapshots with start <= ts < end (ms, datetimes or date strings).
+        Returns {'ts', 'bid_px', 'bid_qty', 'ask_px', 'ask_qty'}; the level
+        columns have shape (snapshots, depth). With scaled=True prices and
+        quantities are converted to float; otherwise the raw int64 memory
+        maps are returned (zero copy when the range falls in one day).
+        """
+        start = self._to_ms(start) if start is not None else None
+        end = self._to_ms(end) if end is not None else None
+        
+        parts = []
+        for day in self.days():
+            day_start = self._to_ms(day)
+            if end is not None and day_start >= end:
+                continue
+            if start is not None and day_start + 86400000 <= start:
+                continue
+            
+            columns, meta = self.open_day(day)
+            lo = np.searchsorted(columns['ts'], start) if start is not None else 0
+            hi = np.searchsorted(columns['ts'], end) if end is not None else len(columns['ts'])
+            part = {name: values[lo:hi] for name, values in columns.items()}
+            
+            if scaled:
+                for column in COLUMNS:
+                    decimals = meta['price_decimals'] if column.endswith('px') else meta['qty_decimals']
+                    part[column] = part[column] / 10 ** decimals
+            parts.append(part)
+        
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return {'ts': np.empty(0, dtype=np.int64)}
+        return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+    
+    @staticmethod
+    def _map(path, width):
+        size = os.path.getsize(path) // (8 * width)
+        if size == 0:
+            return np.empty((0, width), dtype=np.int64)
+        return np.memmap(path, dtype=np.int64, mode='r', shape=(size, width))
+    
+    @staticmethod
+    def _to_ms(value):
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        return int(pd.Timestamp(value).value // 1_000_000)
@@ -3,23 +3,22 @@ Visualización Rápida - Abre automáticamente el gráfico en el navegador
 Versión corregida con puntos para Squeeze State
 """
 
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import webbrowser
 import os
 import sys
 
+from dataset_writer import read_dated_frame
+
 
 def quick_visualize(csv_path, auto_open=True):
     """Visualización rápida de datos de trading - Versión corregida"""
 
     print(f"🚀 Cargando: {csv_path}")
 
-    # Cargar datos
-    df = pd.read_csv(csv_path)
-    df['date'] = pd.to_datetime(df['date'])
-    df.set_index('date', inplace=True)
+    # Cargar datos (los archivos .candles se mapean en memoria sin parsear texto)
+    df = read_dated_frame(csv_path)
 
     print(f"✅ {len(df)} velas cargadas")
     print(f"📊 Columnas disponibles: {list(df.columns)}")
@@ -280,12 +279,16 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         csv_file = sys.argv[1]
     else:
-        # Usar el último archivo procesado
-        csv_file = 'data/exports/latest_dataset.csv'
+        # Usar el último archivo procesado (binario si existe)
+        csv_file = 'data/exports/latest_dataset.candles'
+        if not os.path.exists(csv_file):
+            csv_file = 'data/exports/latest_dataset.csv'
 
     if os.path.exists(csv_file):
         quick_visualize(csv_file)
     else:
         print("❌ Archivo no encontrado. Ejemplos:")
         print("python quick_visualize.py data/processed/BTCUSDT_4h_20251023_224303.csv")
-        print("python quick_visualize.py data/exports/latest_dataset.csv")
\ No newline at end of file
+        print("python quick_visualize.py data/exports/latest_dataset.csv")
+        print("python quick_visualize.py data/exports/latest_dataset.candles")
+        print("python quick_visualize.py data/exports/latest_dataset.parquet")
\ No newline at end of file
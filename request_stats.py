@@ -0,0 +1,128 @@
+"""
+Request Stats - Per-endpoint instrumentation of the exchange clients
+
+Counts requests, errors and retries, response bytes, parse time and the last
+used weight per endpoint, and keeps a latency histogram with logarithmic
+buckets (about 5% wide from 0.1 ms to 120 s). Recording is a lock, a log and
+a few additions, so it stays on for every request; percentiles are computed
+only when queried.
+
+    from binanceExc import get_stats
+
+    stats = get_stats()
+    stats.snapshot()['klines']['p95_ms']
+    stats.log_summary()
+"""
+
+import math
+import threading
+
+import numpy as np
+import structlog
+
+
+MIN_LATENCY = 1e-4
+MAX_LATENCY = 120.0
+GROWTH = 1.05
+BUCKETS = int(math.log(MAX_LATENCY / MIN_LATENCY) / math.log(GROWTH)) + 2
+
+
+class EndpointStats:
+    """Counters and latency histogram of one endpoint"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.parse_total = 0.0
+        self.parses = 0
+        self.used_weight = None
+        self.histogram = np.zeros(BUCKETS, dtype=np.int64)
+    
+    def percentile(self, q):
+        """Latency (seconds) below which q percent of the requests completed"""
+        total = self.histogram.sum()
+        if total == 0:
+            return None
+        bucket = int(np.searchsorted(np.cumsum(self.histogram), math.ceil(total * q / 100)))
+        return min(MIN_LATENCY * GROWTH ** bucket, self.latency_max)
+
+
+class RequestStats:
+    """Thread-safe per-endpoint request statistics"""
+    
+    def __init__(self):
+        self.logger = structlog.get_logger(__name__)
+        self._lock = threading.Lock()
+        self._endpoints = {}
+    
+    def record(self, endpoint, latency, nbytes, status=200, used_weight=None):
+        """Record one HTTP round-trip"""
+        bucket = 0 if latency <= MIN_LATENCY else min(int(math.log(latency / MIN_LATENCY) / math.log(GROWTH)) + 1, BUCKETS - 1)
+        
+        with self._lock:
+            stats = self._get(endpoint)
+            stats.requests += 1
+            stats.bytes += nbytes
+            stats.latency_total += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            stats.histogram[bucket] += 1
+            if status is None or status >= 400:
+                stats.errors += 1
+            if used_weight is not None:
+                stats.used_weight = int(used_weight)
+    
+    def record_error(self, endpoint, latency):
+        """Record a round-trip that failed without a response (timeout, connection error)"""
+        self.record(endpoint, latency, 0, status=None)
+    
+    def record_retry(self, endpoint):
+        with self._lock:
+            self._get(endpoint).retries += 1
+    
+    def record_parse(self, endpoint, seconds):
+        with self._lock:
+            stats = self._get(endpoint)
+            stats.parse_total += seconds
+            stats.parses += 1
+    
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+    
+    def snapshot(self):
+        """{endpoint: {requests, errors, retries, bytes, mean/p50/p95/p99/max latency in ms, ...}}"""
+        result = {}
+        with self._lock:
+            for endpoint, stats in self._endpoints.items():
+                ms = lambda seconds: None if seconds is None else round(seconds * 1000, 3)
+                result[endpoint] = {
+                    'requests': stats.requests,
+                    'errors': stats.errors,
+                    'retries': stats.retries,
+                    'bytes': stats.bytes,
+                    'mean_ms': ms(stats.latency_total / stats.requests) if stats.requests else None,
+                    'p50_ms': ms(stats.percentile(50)),
+                    'p95_ms': ms(stats.percentile(95)),
+                    'p99_ms': ms(stats.percentile(99)),
+                    'max_ms': ms(stats.latency_max),
+                    'parse_ms': ms(stats.parse_total / stats.parses) if stats.parses else None,
+                    'used_weight': stats.used_weight,
+                }
+        return result
+    
+    def log_summary(self, logger=None):
+        """Log one structured line per endpoint, slowest p95 first"""
+        logger = logger or self.logger
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1]['p95_ms'] or 0, reverse=True)
+        for endpoint, row in rows:
+            logger.info('exchange_request_stats', endpoint=endpoint, **row)
+    
+    def _get(self, endpoint):
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = EndpointStats()
+        return stats
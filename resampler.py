@@ -0,0 +1,179 @@
+"""
+Resampler - Derive coarser klines from a finer series and join them back
+
+resample_candles() turns e.g. 1h candles into 4h or 1d candles with
+vectorized group reductions over the int64 open times (first open, max high,
+min low, last close, summed volumes), using Binance's candle boundaries:
+fixed width intervals from the epoch, weeks from Monday, months by calendar.
+
+join_higher_timeframe() attaches higher timeframe columns to every lower
+timeframe row using only the higher timeframe candles that had closed when
+that row closed, so no row ever sees a value from its own unfinished 4h/1d
+candle (no look-ahead).
+
+    h4 = resample_candles(h1, '1h', '4h')
+    h4 = indicators.calculate_all_indicators(h4)
+    h1 = join_higher_timeframe(h1, '1h', h4, '4h', columns=['adx', 'ema55'])
+    # -> h1['adx_4h'], h1['ema55_4h']
+"""
+
+import numpy as np
+import pandas as pd
+
+from binanceExc import Binance
+
+
+SUM_COLUMNS = ('volume', 'quote_volume', 'trades', 'taker_buy_volume', 'taker_buy_quote_volume')
+
+
+def candle_open_times(times, interval):
+    """Open time (ms) of the `interval` candle containing each ms timestamp"""
+    times = np.asarray(times, dtype='int64')
+    if interval == '1M':
+        return times.view('datetime64[ms]').astype('datetime64[M]').astype('datetime64[ms]').astype('int64')
+
+    offset = Binance.WEEK_OFFSET_MS if interval == '1w' else 0
+    return times - (times - offset) % Binance.INTERVAL_MS[interval]
+
+
+def candle_end_times(open_times, interval):
+    """Open time of the next candle (ms) for each candle open time"""
+    open_times = np.asarray(open_times, dtype='int64')
+    if interval == '1M':
+        months = open_times.view('datetime64[ms]').astype('datetime64[M]') + 1
+        return months.astype('datetime64[ms]').astype('int64')
+    return open_times + Binance.INTERVAL_MS[interval]
+
+
+def check_intervals(base_interval, interval):
+    """Raise unless candles of interval are made of whole base_interval candles"""
+    intervals = Binance.KLINE_INTERVALS
+    if base_interval not in intervals or interval not in intervals:
+        raise ValueError(f'Unknown interval, expected one of {intervals}')
+    if intervals.index(interval) <= intervals.index(base_interval):
+        raise ValueError(f'{interval} is not coarser than {base_interval}')
+
+    base_ms = Binance.INTERVAL_MS.get(base_interval)
+    if interval == '1M':
+        valid = base_ms is not None and Binance.INTERVAL_MS['1d'] % base_ms == 0
+    else:
+        valid = Binance.INTERVAL_MS[interval] % base_ms == 0
+    if not valid:
+        raise ValueError(f'{interval} candles are not made of whole {base_interval} candles')
+
+
+def resample_candles(df, base_interval, interval, drop_partial=True):
+    """
+    Aggregate candles of base_interval into candles of a coarser interval
+
+    Args:
+        df: Frame sorted by its int64 ms 'time' column with open/high/low/close
+            (and any of SUM_COLUMNS), e.g. as returned by download_data
+        base_interval: Interval of df
+        interval: Coarser interval from Binance.KLINE_INTERVALS
+        drop_partial: Drop the first/last candle when df starts after it opens
+                      or ends before it closes
+
+    Returns:
+        Frame with time, open, high, low, close, the summed columns and close_time
+    """
+    check_intervals(base_interval, interval)
+
+    times = df['time'].to_numpy(dtype='int64')
+    if len(times) == 0:
+        return pd.DataFrame(columns=['time', 'open', 'high', 'low', 'close', *[c for c in SUM_COLUMNS if c in df], 'close_time'])
+
+    buckets = candle_open_times(times, interval)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(times)) - 1
+
+    out = {
+        'time': buckets[starts],
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends],
+    }
+    for column in SUM_COLUMNS:
+        if column in df:
+            out[column] = np.add.reduceat(df[column].to_numpy(), starts)
+
+    close_times = candle_end_times(out['time'], interval)
+    out['close_time'] = close_times - 1
+    result = pd.DataFrame(out)
+
+    # The first/last candles are partial when the base series starts after the
+    # first one opens or stops before the last one closes
+    if drop_partial:
+        first = 1 if times[0] > out['time'][0] else 0
+        last = len(result) - 1 if candle_end_times(times[-1:], base_interval)[0] < close_times[-1] else len(result)
+        result = result.iloc[first:last].reset_index(drop=True)
+
+    return result
+
+
+def join_higher_timeframe(df, base_interval, htf, interval, columns=None, suffix=None):
+    """
+    Attach columns of a higher timeframe frame to every lower timeframe row
+
+    Each row of df gets the values of the last htf candle that had closed by
+    the time the row's own candle closed. Rows before the first closed htf
+    candle get NaN.
+
+    Args:
+        df: Lower timeframe frame with an int64 ms 'time' column
+        base_interval: Interval of df
+        htf: Higher timeframe frame with an int64 ms 'time' column
+        interval: Interval of htf
+        columns: htf columns to attach (default: all but time/close_time)
+        suffix: Appended to the attached column names (default: '_' + interval)
+
+    Returns:
+        Copy of df with the attached columns
+    """
+    if columns is None:
+        columns = [c for c in htf.columns if c not in ('time', 'close_time')]
+    suffix = f'_{interval}' if suffix is None else suffix
+
+    available = candle_end_times(htf['time'].to_numpy(dtype='int64'), interval)
+    closes = candle_end_times(df['time'].to_numpy(dtype='int64'), base_interval)
+    at = np.searchsorted(available, closes, side='right') - 1
+
+    result = df.copy()
+    missing = at < 0
+    if len(htf) == 0:
+        for column in columns:
+            result[f'{column}{suffix}'] = np.nan
+        return result
+
+    attached = htf[columns].iloc[np.where(missing, 0, at)]
+    attached.index = result.index
+    attached = attached.where(pd.Series(~missing, index=result.index), axis=0)
+    for column in columns:
+        result[f'{column}{suffix}'] = attached[column]
+    return result
+
+
+def add_higher_timeframes(df, base_interval, intervals, compute=None, columns=None):
+    """
+    Resample df to each interval, optionally compute features on it, and join
+    the result back onto df
+
+    Args:
+        df: Lower timeframe frame (time/open/high/low/close/volume)
+        base_interval: Interval of df
+        intervals: Coarser intervals, e.g. ['4h', '1d']
+        compute: Function frame -> frame run on every resampled frame
+                 (e.g. indicators.calculate_all_indicators)
+        columns: Columns to attach from every resampled frame (default: all)
+
+    Returns:
+        Copy of df with '<column>_<interval>' columns
+    """
+    result = df
+    for interval in intervals:
+        htf = resample_candles(df, base_interval, interval)
+        if compute is not None:
+            htf = compute(htf)
+        result = join_higher_timeframe(result, base_interval, htf, interval, columns=columns)
+    return result
@@ -6,9 +6,10 @@ Uses exact same implementations as SMI.py
 
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
 import structlog
 
+from linreg import rolling_linreg
+
 
 class TechnicalIndicators:
     """Unified technical indicators calculator using SMI.py implementations"""
@@ -115,53 +116,50 @@ class TechnicalIndicators:
         return tr_plus.fillna(0), tr_minus.fillna(0)
     
     def calculate_adx_smi_style(self, df, period=14):
-        """Calculate ADX using exact same implementation as SMI.py"""
-        df_tmp = pd.DataFrame()
-        df_tmp['open'] = df['open']
-        df_tmp['high'] = df['high']
-        df_tmp['low'] = df['low']
-        df_tmp['close'] = df['close']
-        df_tmp['up'] = df['high'].diff()
-        df_tmp['down'] = -df['low'].diff()
-        df_tmp['up'] = df_tmp['up'].fillna(0)
-        df_tmp['down'] = df_tmp['down'].fillna(0)
+        """
+        Calculate ADX using exact same implementation as SMI.py
+        
+        Vectorized over whole columns; the output is identical to the row by
+        row version (same operations, same order, same NaN handling).
+        
+        The three pandas ewm passes (plus the one inside the true range) are
+        most of the run time, about 1.6 s for 10M rows. They stay: a recursive
+        numpy/numba EMA rounds differently and breaks the exact equality that
+        tests/test_technical_indicators.py enforces.
+        """
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        
+        # high.diff() and -low.diff() with the missing moves as 0
+        up = np.empty_like(high)
+        up[:1] = 0
+        np.subtract(high[1:], high[:-1], out=up[1:])
+        up[np.isnan(up)] = 0
+        down = np.empty_like(low)
+        down[:1] = 0
+        np.subtract(low[1:], low[:-1], out=down[1:])
+        np.negative(down, out=down)
+        down[np.isnan(down)] = 0
         
         # Calculate True Range (manual implementation)
-        df_tmp['TR'] = self._calculate_true_range(df)
-        df_tmp['truerange'] = self._calculate_smma(df_tmp, period=14, column="TR", adjust=True)
+        truerange = self._smma(self._true_range(high, low, df['close'].to_numpy(dtype=np.float64)), 14)
+        truerange = np.where(np.isnan(truerange), 0, truerange)
+        
+        # Directional movement: the larger positive move of the two, else 0
+        # (the smoothed arrays are read-only views, so the first step of each is not in place)
+        plus = np.multiply(self._smma(np.where(up > np.maximum(down, 0), up, 0.0), 14), 100)
+        minus = np.multiply(self._smma(np.where(down > np.maximum(up, 0), down, 0.0), 14), 100)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(plus, truerange, out=plus)
+            np.divide(minus, truerange, out=minus)
+            
+            total = np.add(minus, plus, out=truerange)
+            total[total == 0] = 1
+            tmp = np.subtract(plus, minus, out=plus)
+            np.abs(tmp, out=tmp)
+            np.divide(tmp, total, out=tmp)
         
-        df_tmp = df_tmp.fillna(0)
-
-        for i in range(0, len(df_tmp['close'])):
-            if (df_tmp.loc[i,"up"] > df_tmp.loc[i,"down"]) & (df_tmp.loc[i,"up"] > 0):
-                df_tmp.loc[i, 'plus'] = df_tmp.loc[i, 'up']
-            else:
-                df_tmp.loc[i, 'plus'] = 0
-            if (df_tmp.loc[i,"down"] > df_tmp.loc[i,"up"]) & (df_tmp.loc[i,"down"] > 0):
-                df_tmp.loc[i, 'minus'] = df_tmp.loc[i, 'down']
-            else:
-                df_tmp.loc[i, 'minus'] = 0
-
-        df_tmp['plus'] = df_tmp['plus'].fillna(0)
-        df_tmp['minus'] = df_tmp['minus'].fillna(0)
-
-        df_tmp['plus'] = self._calculate_smma(df_tmp, period=14, column='plus', adjust=True)
-        df_tmp['minus'] = self._calculate_smma(df_tmp, period=14, column='minus', adjust=True)
-
-        df_tmp['plus'] = 100 * df_tmp['plus'] / df_tmp['truerange']
-        df_tmp['minus'] = 100 * df_tmp['minus'] / df_tmp['truerange']
-
-        df_tmp['sum'] = df_tmp['minus'] + df_tmp['plus']
-
-        for i in range(0, len(df_tmp['sum'])):
-          if float(df_tmp.loc[i,'sum']) == 0:
-              df_tmp.loc[i,'tmp'] = abs(df_tmp.loc[i,'plus'] - df_tmp.loc[i,'minus']) / 1
-          else:
-              df_tmp.loc[i,'tmp'] = abs(df_tmp.loc[i,'plus'] - df_tmp.loc[i,'minus']) / df_tmp.loc[i,'sum']
-
-        df_tmp['ADX'] = 100 * self._calculate_smma(df_tmp, period=period, column='tmp', adjust=True)
-
-        return df_tmp['ADX']
+        return pd.Series(np.multiply(self._smma(tmp, period), 100), index=df.index, name='ADX', copy=False)
     
     def calculate_atr_smi_style(self, df):
         """Calculate ATR using exact same implementation as SMI.py"""
@@ -198,18 +196,9 @@ class TechnicalIndicators:
         df_tem['source'] = df['close'] - df_tem['aveHLS']
         df_tem = df_tem.fillna(0)
 
-        y_all = df_tem['source'].values.tolist()
-        x = np.array(list(range(1, kclength+1))).reshape((-1, 1))
-
-        smh = []
-        for i in range(len(df_tem['close'])-1, kclength*2, -1):
-            y = np.array(y_all[i-kclength+1:i+1])
-            reg = LinearRegression(fit_intercept = True).fit(x, y)
-            smh.append(reg.predict(x)[-1])
-
-        tmp = [0 for _ in range(len(y_all)-len(smh))]
-        smh = smh + tmp
-        smh.reverse()
+        # ta.linreg endpoint of every window; the first 2*kclength+1 values stay 0
+        smh = rolling_linreg(df_tem['source'].to_numpy(), kclength)
+        smh[:kclength * 2 + 1] = 0
 
         return pd.Series(smh, name="{0} period SMI".format(kclength))
     
@@ -230,10 +219,7 @@ class TechnicalIndicators:
         
         if use_true_range:
             # Calculate True Range
-            tr1 = df['high'] - df['low']
-            tr2 = (df['high'] - df['close'].shift()).abs()
-            tr3 = (df['low'] - df['close'].shift()).abs()
-            t_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+            t_range = self._calculate_true_range(df)
         else:
             t_range = df['high'] - df['low']
             
@@ -256,22 +242,10 @@ class TechnicalIndicators:
         # This matches the Pine Script calculation: source - math.avg(math.avg(highest, lowest), sma(close))
         source_val = df['close'] - avg_hl_sma
         
-        # Linear regression for momentum (matching ta.linreg)
-        squeeze_momentum = []
-        for i in range(len(source_val)):
-            if i >= kc_length - 1:
-                y = source_val.iloc[i-kc_length+1:i+1].values
-                x = np.array(range(1, kc_length+1)).reshape(-1, 1)  # Start from 1 like Pine Script
-                if len(y) == kc_length and not np.any(np.isnan(y)):
-                    reg = LinearRegression(fit_intercept=True).fit(x, y)
-                    # Predict the last value (kc_length) like Pine Script's ta.linreg
-                    squeeze_momentum.append(reg.predict([[kc_length]])[0])
-                else:
-                    squeeze_momentum.append(0)
-            else:
-                squeeze_momentum.append(0)
-        
-        squeeze_momentum = pd.Series(squeeze_momentum, index=df.index)
+        # Linear regression for momentum (matching ta.linreg); 0 before the first
+        # full window and for windows containing NaN
+        squeeze_momentum = rolling_linreg(source_val.to_numpy(), kc_length)
+        squeeze_momentum = pd.Series(np.where(np.isnan(squeeze_momentum), 0.0, squeeze_momentum), index=df.index)
         
         # Create squeeze state column using Pine Script naming
         squeeze_state = pd.Series('no_squeeze', index=df.index)
@@ -282,21 +256,31 @@ class TechnicalIndicators:
     
     def _calculate_true_range(self, df):
         """Calculate True Range manually"""
-        high = df['high']
-        low = df['low']
-        close = df['close']
-        
-        tr1 = high - low
-        tr2 = (high - close.shift()).abs()
-        tr3 = (low - close.shift()).abs()
-        
-        return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        tr = self._true_range(df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64),
+                              df['close'].to_numpy(dtype=np.float64))
+        return pd.Series(tr, index=df.index)
+    
+    @staticmethod
+    def _true_range(high, low, close):
+        """True Range of float arrays; row max skipping NaN, like pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)"""
+        # The first row has no previous close, so its range is high - low
+        tr = np.subtract(high, low)
+        gap = np.subtract(high[1:], close[:-1])
+        np.fmax(tr[1:], np.abs(gap, out=gap), out=tr[1:])
+        np.subtract(low[1:], close[:-1], out=gap)
+        np.fmax(tr[1:], np.abs(gap, out=gap), out=tr[1:])
+        return tr
     
     def _calculate_smma(self, df, period=14, column="TR", adjust=True):
         """Calculate Smoothed Moving Average (SMMA)"""
         # SMMA is equivalent to EMA with adjust=False
         return df[column].ewm(span=period, adjust=adjust).mean()
     
+    @staticmethod
+    def _smma(values, period=14):
+        """_calculate_smma of a float array (read-only result)"""
+        return pd.Series(values, copy=False).ewm(span=period, adjust=True).mean().to_numpy()
+    
     def _convert_squeeze_state_to_numeric(self, squeeze_state):
         """Convert squeeze state to numeric values for visualization"""
         state_mapping = {
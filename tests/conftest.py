@@ -0,0 +1,10 @@
+import logging
+import os
+import sys
+
+import structlog
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
@@ -0,0 +1,35 @@
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from archive_importer import KlineArchiveImporter
+
+HOUR = 3_600_000
+
+
+def write_archive(directory, period, start, end):
+    times = np.arange(pd.Timestamp(start).value // 10**6, pd.Timestamp(end).value // 10**6, HOUR)
+    rows = '\n'.join(f'{t},1,1,1,1,1,{t + HOUR - 1},1,1,1,1,0' for t in times)
+    with zipfile.ZipFile(directory / f'BTCUSDT-1h-{period}.zip', 'w') as archive:
+        archive.writestr(f'BTCUSDT-1h-{period}.csv', rows + '\n')
+
+
+def test_only_archives_overlapping_the_range_are_read(tmp_path):
+    write_archive(tmp_path, '2024-01', '2024-01-01', '2024-02-01')
+    write_archive(tmp_path, '2024-02', '2024-02-01', '2024-03-01')
+    write_archive(tmp_path, '2024-03-01', '2024-03-01', '2024-03-02')
+    write_archive(tmp_path, '2024-03-02', '2024-03-02', '2024-03-03')
+
+    importer = KlineArchiveImporter(str(tmp_path))
+    read = []
+    read_archive = importer.read_archive
+    importer.read_archive = lambda path, extended=False: read.append(path) or read_archive(path, extended)
+
+    start = pd.Timestamp('2024-02-29 23:00').value // 10**6
+    end = pd.Timestamp('2024-03-01 05:00').value // 10**6
+    df = importer.load('BTCUSDT', '1h', start, end)
+
+    assert sorted(path.rsplit('-1h-', 1)[1] for path in read) == ['2024-02.zip', '2024-03-01.zip']
+    assert df['time'].iloc[0] == start and df['time'].iloc[-1] == end
+    assert len(df) == 7
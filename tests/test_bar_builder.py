@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from bar_builder import dollar_bars, volume_bars
+
+
+def trades(qty, price=None):
+    qty = np.asarray(qty, dtype=np.float64)
+    price = np.full(len(qty), 100.0) if price is None else np.asarray(price, dtype=np.float64)
+    return pd.DataFrame({'time': np.arange(len(qty), dtype=np.int64) * 1000, 'price': price, 'qty': qty})
+
+
+def test_bar_assignment_does_not_round_across_boundaries():
+    # cumsum - qty puts the zero-quantity trade one bar after its predecessor
+    bars = volume_bars(trades([0.01, 381.59, 0.0, 994.59]), 0.4, include_partial=True)
+    assert bars['trades'].tolist() == [2, 2]
+
+
+def test_bars_are_monotonic_and_cover_every_trade():
+    rng = np.random.default_rng(0)
+    data = trades(np.round(rng.random(20_000) * 10.0 ** rng.integers(-2, 3, 20_000), 2),
+                  price=100 + rng.random(20_000))
+
+    for bars in (volume_bars(data, 25, include_partial=True), dollar_bars(data, 5_000, include_partial=True)):
+        assert bars['trades'].sum() == len(data)
+        assert bars['time'].is_monotonic_increasing
+        assert np.isclose(bars['volume'].sum(), data['qty'].sum())
@@ -0,0 +1,129 @@
+import asyncio
+import socket
+
+import aiohttp
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from binanceAsync import AsyncBinance
+from binanceExc import ENDPOINTS, Binance, WeightGovernor
+from local_binance_server import LocalBinanceServer
+from request_stats import RequestStats
+
+
+START = pd.Timestamp('2024-01-01 00:00:30').value // 10**6
+END = pd.Timestamp('2024-01-03 12:00').value // 10**6
+
+
+@pytest.fixture(scope='module')
+def server():
+    with LocalBinanceServer() as server:
+        yield server
+
+
+def run(base, coroutine, governor=None):
+    async def main():
+        async with AsyncBinance(base=base, governor=governor or WeightGovernor()) as exchange:
+            return await coroutine(exchange)
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('interval', ['1m', '1h', '1d'])
+@pytest.mark.parametrize('extended', [False, True])
+def test_klines_match_the_sync_client(server, interval, extended):
+    expected = Binance(base=server.url).GetSymbolKlinesRange('BTCUSDT', interval, START, END, extended)
+    df = run(server.url, lambda exchange: exchange.GetSymbolKlinesRange('BTCUSDT', interval, START, END, extended))
+
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_limit_klines_match_the_sync_client(server):
+    expected = Binance(base=server.url).GetSymbolKlines('ETHUSDT', '4h', limit=500)
+    df = run(server.url, lambda exchange: exchange.GetSymbolKlines('ETHUSDT', '4h', limit=500))
+
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_json_endpoints_match_the_sync_client(server):
+    exchange = Binance(base=server.url)
+    expected = [exchange.GetPrice('BTCUSDT'), exchange.GetOrderBook('BTCUSDT', 50)]
+    got = run(server.url, lambda exchange: asyncio.gather(exchange.GetPrice('BTCUSDT'),
+                                                          exchange.GetOrderBook('BTCUSDT', 50)))
+
+    for data, reference in zip(got, expected):
+        assert data.keys() == reference.keys()
+        assert {k: type(v) for k, v in data.items()} == {k: type(v) for k, v in reference.items()}
+
+
+def test_range_is_unique_ordered_and_complete(server):
+    df = run(server.url, lambda exchange: exchange.GetSymbolKlinesRange('BTCUSDT', '1m', START, END))
+
+    times = df['time'].to_numpy()
+    assert len(AsyncBinance.PlanKlineWindows('1m', START, END)) > 1
+    assert times[0] == START - START % 60_000 + 60_000
+    assert times[-1] == END
+    assert (np.diff(times) == 60_000).all()
+
+
+def test_concurrent_ranges_are_not_mixed(server):
+    async def ranges(exchange):
+        return await asyncio.gather(*[exchange.GetSymbolKlinesRange(symbol, '5m', START, END)
+                                      for symbol in ('BTCUSDT', 'ETHUSDT', 'BTCUSDT')])
+
+    btc, eth, again = run(server.url, ranges)
+    pd.testing.assert_frame_equal(btc, again)
+    assert not btc['close'].equals(eth['close'])
+
+
+def test_weight_budget_is_shared_with_the_sync_client():
+    governor = WeightGovernor()
+    with LocalBinanceServer() as server:
+        Binance(base=server.url, governor=governor).GetPrice('BTCUSDT')
+        assert governor.used == 2
+
+        run(server.url, lambda exchange: asyncio.gather(exchange.GetPrice('BTCUSDT'),
+                                                        exchange.GetOrderBook('BTCUSDT'),
+                                                        exchange.GetSymbolKlinesRange('BTCUSDT', '1m', START, END)),
+            governor=governor)
+
+    windows = len(Binance.PlanKlineWindows('1m', START, END))
+    assert governor.used == 2 + 2 + 5 + 2 * windows
+
+
+def test_last_attempt_does_not_pause_the_governor():
+    governor = WeightGovernor()
+    with LocalBinanceServer(error_rate=1.0, error_status=429) as server:
+        url = server.url + ENDPOINTS['price']
+        response = Binance(base=server.url, governor=governor, max_retries=0)._request(url, {'symbol': 'BTCUSDT'})
+        assert response.status_code == 429
+
+        async def request(exchange):
+            exchange.max_retries = 0
+            return await exchange._request(url, {'symbol': 'BTCUSDT'})
+        status, _ = run(server.url, request, governor=governor)
+        assert status == 429
+
+    assert governor._paused_until == 0.0
+
+
+def test_connection_errors_are_recorded():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        base = f'http://127.0.0.1:{sock.getsockname()[1]}'
+    url = base + ENDPOINTS['price']
+
+    stats = RequestStats()
+    with pytest.raises(requests.ConnectionError):
+        Binance(base=base, stats=stats)._request(url, {'symbol': 'BTCUSDT'})
+
+    async def request():
+        async with AsyncBinance(base=base, stats=stats) as exchange:
+            await exchange._request(url, {'symbol': 'BTCUSDT'})
+    with pytest.raises(aiohttp.ClientError):
+        asyncio.run(request())
+
+    row = stats.snapshot()['price']
+    assert row['requests'] == row['errors'] == 2
+    assert row['max_ms'] is not None
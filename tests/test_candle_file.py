@@ -0,0 +1,24 @@
+import decimal
+
+import numpy as np
+import pandas as pd
+
+from candle_file import CandleFile, write_candles
+
+
+def test_non_string_text_columns_keep_their_values(tmp_path):
+    path = str(tmp_path / 'mixed.candles')
+    df = pd.DataFrame({
+        'time': np.arange(4, dtype=np.int64) * 60_000,
+        'close': [1.0, 2.0, 3.0, 4.0],
+        'stamp': [pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-02'), None, pd.Timestamp('2024-01-01')],
+        'flag': [True, np.nan, False, True],
+        'amount': [decimal.Decimal('1.5'), decimal.Decimal('2'), decimal.Decimal('1.5'), None],
+        'squeeze_state': ['squeeze_on', 'no_squeeze', None, 'squeeze_on'],
+    })
+    write_candles(path, df, 'BTCUSDT', '1m')
+
+    frame = CandleFile(path).frame()
+    for column in ('stamp', 'flag', 'amount', 'squeeze_state'):
+        expected = [None if pd.isna(value) else str(value) for value in df[column]]
+        assert [None if pd.isna(value) else value for value in frame[column]] == expected
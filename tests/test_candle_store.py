@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from candle_store import CandleStore
+
+HOUR = 3_600_000
+LISTED = 1_700_000_000_000 // HOUR * HOUR
+
+
+class ListedExchange:
+    """Hourly candles that exist only from LISTED on"""
+    
+    def __init__(self, now):
+        self.now = now
+        self.calls = []
+    
+    def GetSymbolKlinesRange(self, symbol, interval, start, end=None):
+        self.calls.append((start, end))
+        end = self.now if end is None else end
+        times = np.arange(max(start, LISTED), end + 1, HOUR, dtype=np.int64)
+        times = times[times >= start]
+        return pd.DataFrame({'time': times, 'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0,
+                             'volume': 1.0, 'close_time': times + HOUR - 1})
+    
+    def _clock_ms(self):
+        return self.now
+
+
+def test_backfill_before_listing_is_not_repeated(tmp_path):
+    exchange = ListedExchange(now=LISTED + 10 * HOUR)
+    store = CandleStore(str(tmp_path), exchange=exchange)
+    start = LISTED - 100 * HOUR
+    
+    store.sync('BTCUSDT', '1h', start=LISTED + 5 * HOUR)
+    store.sync('BTCUSDT', '1h', start=start)
+    assert store.first_open_time('BTCUSDT', '1h') == LISTED
+    
+    exchange.calls.clear()
+    exchange.now += 2 * HOUR
+    assert store.sync('BTCUSDT', '1h', start=start) == 2
+    assert exchange.calls == [(LISTED + 9 * HOUR + 1, None)]
+    assert store.covered_from('BTCUSDT', '1h') == start
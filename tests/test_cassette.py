@@ -0,0 +1,50 @@
+import time
+
+import pandas as pd
+import pytest
+
+from binanceExc import Binance
+from cassette import Cassette
+from data_downloader import DataDownloader
+from local_binance_server import LocalBinanceServer
+
+
+def download(base, cassette, limit):
+    downloader = DataDownloader()
+    downloader.exchange = Binance(base=base, cassette=cassette)
+    return downloader.download_data('BTCUSDT', '1m', limit=limit)
+
+
+def test_replay_of_a_multi_request_download(tmp_path):
+    path = str(tmp_path / 'klines.json.gz')
+
+    with LocalBinanceServer() as server, Cassette(path, 'record') as cassette:
+        recorded = download(server.url, cassette, limit=3000)
+    assert len(recorded) == 3000
+
+    # Every window of the replay is computed from the recording's clock
+    time.sleep(0.01)
+    with Cassette(path, 'replay') as cassette:
+        replayed = download('http://127.0.0.1:9', cassette, limit=3000)
+
+    pd.testing.assert_frame_equal(replayed, recorded)
+
+
+def test_replay_of_an_unrecorded_request_fails(tmp_path):
+    path = str(tmp_path / 'klines.json.gz')
+
+    with LocalBinanceServer() as server, Cassette(path, 'record') as cassette:
+        download(server.url, cassette, limit=1500)
+
+    with Cassette(path, 'replay') as cassette, pytest.raises(LookupError):
+        download('http://127.0.0.1:9', cassette, limit=2500)
+
+
+def test_cassette_keeps_the_recording_time(tmp_path):
+    path = str(tmp_path / 'klines.json.gz')
+
+    with LocalBinanceServer() as server, Cassette(path, 'record') as cassette:
+        Binance(base=server.url, cassette=cassette).GetSymbolKlinesExtra('BTCUSDT', '1h', limit=1200)
+        now = cassette.now
+
+    assert Cassette(path, 'replay').now == now
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_writer import get_writer, read_dataset
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'feather', 'csv'])
+def test_columns_empty_in_the_first_row_group(tmp_path, fmt):
+    df = pd.DataFrame({
+        'time': np.arange(10, dtype=np.int64),
+        'label': [None] * 5 + ['a', 'b', None, 'c', 'd'],
+        'flag': [None] * 5 + [True, False, True, None, False],
+        'value': [np.nan] * 5 + [1.5, 2.5, np.nan, 3.5, 4.5],
+    })
+    path = get_writer(fmt, row_group_size=3).write(df, str(tmp_path / f'data.{fmt}'))
+
+    back = read_dataset(path)
+    assert back['time'].tolist() == df['time'].tolist()
+    for column in ('label', 'flag', 'value'):
+        assert [None if pd.isna(v) else v for v in back[column]] == [None if pd.isna(v) else v for v in df[column]]
@@ -0,0 +1,180 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from binanceExc import Binance
+from kline_stream import CandleBuffer, CandleUpdate, KlineStream, TickerUpdate
+from local_binance_server import LocalBinanceServer
+
+
+STEP = Binance.INTERVAL_MS['1m']
+
+
+@pytest.fixture(scope='module')
+def server():
+    with LocalBinanceServer(stream_period=0.005, updates_per_candle=4) as server:
+        yield server
+
+
+def candle(time, close=1.0, final=True):
+    return CandleUpdate(symbol='BTCUSDT', interval='1m', time=time, open=1.0, high=max(1.0, close), low=min(1.0, close),
+                        close=close, volume=1.0, close_time=time + STEP - 1, final=final, event_time=time)
+
+
+def collect(stream, count, action=None, timeout=10):
+    """First `count` updates of stream; action(stream, updates) runs after each one"""
+    async def main():
+        updates = []
+        async for update in stream:
+            updates.append(update)
+            if action is not None:
+                await action(stream, updates)
+            if len(updates) == count:
+                break
+        await stream.stop()
+        return updates
+    return asyncio.run(asyncio.wait_for(main(), timeout))
+
+
+def test_buffer_replaces_the_open_candle():
+    buffer = CandleBuffer('BTCUSDT', '1m', capacity=10)
+    assert buffer.update(candle(0, close=1.5, final=False))
+    assert buffer.update(candle(0, close=2.0, final=True))
+    assert buffer.update(candle(STEP, close=0.5, final=False))
+    assert not buffer.update(candle(0))
+
+    view = buffer.view()
+    assert len(buffer) == 2
+    assert view['time'].tolist() == [0, STEP]
+    assert view['close'].tolist() == [2.0, 0.5]
+    assert view['final'].tolist() == [True, False]
+
+
+def test_buffer_compacts_at_capacity():
+    buffer = CandleBuffer('BTCUSDT', '1m', capacity=3)
+    storage = buffer._data
+    for i in range(20):
+        buffer.update(candle(i * STEP, close=float(i)))
+        assert len(buffer) == min(i + 1, 3)
+        assert buffer.view()['time'].tolist() == [j * STEP for j in range(max(0, i - 2), i + 1)]
+
+    # Compaction moves the candles within the same storage
+    assert buffer._data is storage
+    assert buffer.frame()['close'].tolist() == [17.0, 18.0, 19.0]
+
+
+def test_final_flags_close_every_candle(server):
+    stream = KlineStream(klines=[('BTCUSDT', '1m')], base=server.ws_url)
+    updates = collect(stream, 12)
+
+    assert all(isinstance(update, CandleUpdate) for update in updates)
+    times = np.array([update.time for update in updates])
+    finals = np.array([update.final for update in updates])
+
+    # updates_per_candle updates per candle, the last one final, then the next candle opens
+    assert finals.tolist() == [False, False, False, True] * 3
+    assert (np.diff(times[finals]) == STEP).all()
+    assert (times[1:][finals[:-1]] == times[:-1][finals[:-1]] + STEP).all()
+
+
+def test_stream_updates_the_buffer_in_place(server):
+    stream = KlineStream(klines=[('BTCUSDT', '1m')], base=server.ws_url)
+    updates = collect(stream, 10)
+
+    buffer = stream.buffers[('BTCUSDT', '1m')]
+    view = buffer.view()
+    assert len(buffer) == 3
+    assert view['time'].tolist() == sorted({update.time for update in updates})
+    assert view['final'].tolist() == [True, True, False]
+    assert view['close'][-1] == updates[-1].close
+
+
+def test_final_only_delivers_closed_candles(server):
+    stream = KlineStream(klines=[('BTCUSDT', '1m')], base=server.ws_url, final_only=True)
+    updates = collect(stream, 3)
+
+    assert all(update.final for update in updates)
+    assert np.diff([update.time for update in updates]).tolist() == [STEP, STEP]
+
+
+def test_subscribe_adds_a_stream_to_the_open_connection(server):
+    async def subscribe(stream, updates):
+        if len(updates) == 1:
+            await stream.subscribe('ETHUSDT', '1m')
+            await stream.subscribe('BTCUSDT')
+
+    stream = KlineStream(klines=[('BTCUSDT', '1m')], base=server.ws_url)
+    updates = collect(stream, 40, subscribe)
+
+    assert updates[0].symbol == 'BTCUSDT'
+    assert any(isinstance(u, CandleUpdate) and u.symbol == 'ETHUSDT' for u in updates)
+    assert any(isinstance(u, TickerUpdate) for u in updates)
+    assert len(stream.buffers[('ETHUSDT', '1m')]) > 0
+
+
+def test_stop_ends_the_iterator(server):
+    stream = KlineStream(klines=[('BTCUSDT', '1m')], base=server.ws_url)
+
+    async def main():
+        updates = []
+        async for update in stream:
+            updates.append(update)
+            if len(updates) == 3:
+                asyncio.ensure_future(stream.stop())
+        return updates
+
+    updates = asyncio.run(asyncio.wait_for(main(), 10))
+    assert len(updates) >= 3
+    assert stream._task is None and stream._ws is None
+
+
+def test_callback_error_ends_the_iterator_with_the_error(server):
+    def on_update(update):
+        if update.final:
+            raise RuntimeError('callback failed')
+
+    stream = KlineStream(klines=[('BTCUSDT', '1m')], base=server.ws_url, on_update=on_update)
+
+    async def main():
+        updates = []
+        with pytest.raises(RuntimeError, match='callback failed'):
+            async for update in stream:
+                updates.append(update)
+        # The iterator stays finished after the error
+        assert [update async for update in stream] == []
+        await stream.stop()
+        return updates
+
+    updates = asyncio.run(asyncio.wait_for(main(), 10))
+    assert len(updates) == 3 and not any(update.final for update in updates)
+
+
+def test_malformed_frames_are_skipped():
+    stream = KlineStream(klines=[('BTCUSDT', '1m')])
+    kline = {'e': 'kline', 'E': 0, 'k': {'t': 0, 'T': STEP - 1, 's': 'BTCUSDT', 'i': '1m', 'o': '1', 'h': '2',
+                                         'l': '0.5', 'c': '1.5', 'v': '10', 'x': False}}
+
+    async def main():
+        stream._queue = asyncio.Queue()
+        for text in ('not json', '[1, 2]', '{"data": {"e": "kline", "k": {}}}',
+                     json.dumps({'data': dict(kline, k=dict(kline['k'], c='oops'))}),
+                     json.dumps({'stream': 'btcusdt@kline_1m', 'data': kline})):
+            await stream._handle(text)
+        return stream._queue.qsize()
+
+    assert asyncio.run(main()) == 1
+    assert stream.buffers[('BTCUSDT', '1m')].view()['close'].tolist() == [1.5]
+
+
+def test_monthly_kline_stream(server):
+    stream = KlineStream(klines=[('BTCUSDT', '1M')], base=server.ws_url)
+    updates = collect(stream, 8)
+
+    opens = sorted({update.time for update in updates})
+    assert len(opens) == 2
+    months = np.array(opens, dtype='datetime64[ms]').astype('datetime64[M]')
+    assert months[1] - months[0] == 1
+    assert (np.array(opens, dtype='datetime64[ms]') == months.astype('datetime64[ms]')).all()
+    assert updates[3].close_time == opens[1] - 1
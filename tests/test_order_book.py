@@ -0,0 +1,69 @@
+import pytest
+
+from order_book import LocalOrderBook, OutOfSyncError
+
+
+SNAPSHOT = {'lastUpdateId': 100, 'bids': [['99.0', '1.0'], ['98.0', '2.0']], 'asks': [['101.0', '1.0'], ['102.0', '3.0']]}
+
+
+def event(first, last, bids=(), asks=()):
+    return {'U': first, 'u': last, 'b': [list(level) for level in bids], 'a': [list(level) for level in asks]}
+
+
+def test_first_live_event_may_span_the_snapshot():
+    book = LocalOrderBook('BTCUSDT')
+    book.seed(SNAPSHOT)
+
+    book.apply(event(96, 105, bids=[('99.5', '4.0')]))
+    assert book.last_update_id == 105
+    assert book.best_bid() == (99.5, 4.0)
+
+    book.apply(event(106, 110, asks=[('101.0', '0')]))
+    assert book.best_ask() == (102.0, 3.0)
+
+
+def test_spanning_event_after_stale_buffered_events():
+    book = LocalOrderBook('BTCUSDT')
+    book.apply(event(90, 95))
+    book.seed(SNAPSHOT)
+
+    book.apply(event(96, 105))
+    assert book.last_update_id == 105
+
+
+def test_buffered_events_are_applied_from_the_one_spanning_the_snapshot():
+    book = LocalOrderBook('BTCUSDT')
+    for first, last in ((90, 95), (96, 103), (104, 108)):
+        book.apply(event(first, last, bids=[('97.0', str(last))]))
+    book.seed(SNAPSHOT)
+
+    assert book.last_update_id == 108
+    assert book.depth(3)[1].tolist() == [1.0, 2.0, 108.0]
+
+
+def test_snapshot_older_than_the_first_event_is_rejected():
+    book = LocalOrderBook('BTCUSDT')
+    book.seed(SNAPSHOT)
+
+    with pytest.raises(OutOfSyncError):
+        book.apply(event(102, 105))
+    assert not book.synced
+
+
+def test_only_the_first_event_may_span():
+    book = LocalOrderBook('BTCUSDT')
+    book.seed(SNAPSHOT)
+    book.apply(event(96, 105))
+
+    with pytest.raises(OutOfSyncError):
+        book.apply(event(104, 110))
+    assert not book.synced
+
+
+def test_gap_after_the_first_event_is_rejected():
+    book = LocalOrderBook('BTCUSDT')
+    book.seed(SNAPSHOT)
+    book.apply(event(101, 105))
+
+    with pytest.raises(OutOfSyncError):
+        book.apply(event(107, 110))
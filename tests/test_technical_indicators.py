@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from technical_indicators import TechnicalIndicators
+
+
+def row_by_row_adx(df, period=14):
+    """The original loop based calculate_adx_smi_style, kept as the reference"""
+    smma = lambda frame, column: frame[column].ewm(span=14 if column != 'tmp' else period, adjust=True).mean()
+    
+    df_tmp = pd.DataFrame()
+    df_tmp['close'] = df['close']
+    df_tmp['up'] = df['high'].diff().fillna(0)
+    df_tmp['down'] = (-df['low'].diff()).fillna(0)
+    df_tmp['TR'] = pd.concat([df['high'] - df['low'], (df['high'] - df['close'].shift()).abs(),
+                              (df['low'] - df['close'].shift()).abs()], axis=1).max(axis=1)
+    df_tmp['truerange'] = smma(df_tmp, 'TR')
+    df_tmp = df_tmp.fillna(0)
+    
+    for i in range(0, len(df_tmp['close'])):
+        if (df_tmp.loc[i, 'up'] > df_tmp.loc[i, 'down']) & (df_tmp.loc[i, 'up'] > 0):
+            df_tmp.loc[i, 'plus'] = df_tmp.loc[i, 'up']
+        else:
+            df_tmp.loc[i, 'plus'] = 0
+        if (df_tmp.loc[i, 'down'] > df_tmp.loc[i, 'up']) & (df_tmp.loc[i, 'down'] > 0):
+            df_tmp.loc[i, 'minus'] = df_tmp.loc[i, 'down']
+        else:
+            df_tmp.loc[i, 'minus'] = 0
+    
+    df_tmp['plus'] = 100 * smma(df_tmp, 'plus') / df_tmp['truerange']
+    df_tmp['minus'] = 100 * smma(df_tmp, 'minus') / df_tmp['truerange']
+    df_tmp['sum'] = df_tmp['minus'] + df_tmp['plus']
+    
+    for i in range(0, len(df_tmp['sum'])):
+        if float(df_tmp.loc[i, 'sum']) == 0:
+            df_tmp.loc[i, 'tmp'] = abs(df_tmp.loc[i, 'plus'] - df_tmp.loc[i, 'minus']) / 1
+        else:
+            df_tmp.loc[i, 'tmp'] = abs(df_tmp.loc[i, 'plus'] - df_tmp.loc[i, 'minus']) / df_tmp.loc[i, 'sum']
+    
+    df_tmp['ADX'] = 100 * smma(df_tmp, 'tmp')
+    return df_tmp['ADX']
+
+
+def candles(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=n))
+    high = close + rng.random(n)
+    low = close - rng.random(n)
+    # A flat stretch (no moves, zero true range) and missing prices
+    close[100:200] = high[100:200] = low[100:200] = close[100]
+    df = pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close})
+    df.loc[[0, 5, 50, 51, 700], 'high'] = np.nan
+    df.loc[[3, 700, 900], 'low'] = np.nan
+    df.loc[[10], 'close'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('period', [14, 7])
+def test_adx_is_bitwise_identical_to_the_row_by_row_version(period):
+    df = candles(1500, seed=period)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = row_by_row_adx(df, period)
+    adx = TechnicalIndicators().calculate_adx_smi_style(df, period)
+    
+    assert adx.index.equals(expected.index) and adx.name == expected.name
+    assert adx.to_numpy().tobytes() == expected.to_numpy().tobytes()
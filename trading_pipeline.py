@@ -5,8 +5,16 @@ Trading Data Pipeline - Main orchestrator for data processing
 import argparse
 import json
 import os
+import pandas as pd
 from config import TradingConfig, ConfigLoader
+from binanceExc import Binance
+from candle_file import write_candles
+from cassette import Cassette
 from data_downloader import downloader
+from dataset_catalog import DatasetCatalog
+from dataset_writer import WRITERS, get_writer, link_latest, read_dataset
+from label_studio_export import write_label_studio_csv
+from resampler import add_higher_timeframes
 from technical_indicators import indicators
 
 
@@ -25,13 +33,24 @@ class TradingPipeline:
         print(f"📈 Limit: {self.config.limit}")
         print()
         
+        # Step 0: Reuse the dataset if this exact request was already produced
+        request = self._request_fields()
+        catalog, key = self._catalog(), DatasetCatalog.request_key(**request)
+        entry = catalog.lookup(key) if catalog is not None else None
+        if entry:
+            print(f"♻️  Dataset already materialized: {entry['path']}")
+            df_with_indicators = read_dataset(entry['path'])
+            if self._exported(entry['path']):
+                print(f"🔗 Exports already point at {entry['path']}")
+            else:
+                self._export_latest(df_with_indicators, entry['path'])
+            self._print_summary(df_with_indicators, entry['path'])
+            print("✅ Pipeline completed successfully!")
+            return df_with_indicators
+        
         # Step 1: Download data
         print("1️⃣ Downloading market data...")
-        df = downloader.download_data(
-            symbol=self.config.symbol,
-            interval=self.config.interval,
-            limit=self.config.limit
-        )
+        df = self._download()
         
         if df is None:
             print("❌ Failed to download data")
@@ -39,17 +58,26 @@ class TradingPipeline:
         
         # Step 2: Calculate technical indicators
         print("2️⃣ Calculating technical indicators...")
-        df_with_indicators = indicators.calculate_all_indicators(
-            df,
-            ema_periods=self.config.ema_periods,
-            adx_period=self.config.adx_period,
-            atr_period=self.config.atr_period,
-            smi_period=self.config.smi_period
-        )
+        df_with_indicators = self._calculate_indicators(df)
+        
+        # Step 2b: Higher timeframe context, resampled from the same download
+        if self.config.higher_timeframes:
+            print(f"🧭 Higher timeframes: {', '.join(self.config.higher_timeframes)}")
+            df_with_indicators = add_higher_timeframes(
+                df_with_indicators,
+                self.config.interval,
+                self.config.higher_timeframes,
+                compute=self._calculate_indicators
+            )
         
         # Step 3: Save results
         print("3️⃣ Saving results...")
-        output_path = self._save_results(df_with_indicators)
+        output_path = self._save_results(df_with_indicators, key)
+        if catalog is not None:
+            output_path = self._record(catalog, key, output_path, request, df_with_indicators)
+        
+        # Exports point at the deduplicated path, which may differ from the file just written
+        self._export_latest(df_with_indicators, output_path)
         
         # Step 4: Print summary
         self._print_summary(df_with_indicators, output_path)
@@ -58,7 +86,42 @@ class TradingPipeline:
         
         return df_with_indicators
     
-    def _save_results(self, df):
+    def _calculate_indicators(self, df):
+        """Indicators of the configured parameters on one candle frame"""
+        return indicators.calculate_all_indicators(
+            df,
+            ema_periods=self.config.ema_periods,
+            adx_period=self.config.adx_period,
+            atr_period=self.config.atr_period,
+            smi_period=self.config.smi_period
+        )
+    
+    def _download(self):
+        """Download market data, through the configured cassette if any"""
+        if self.config.api_base:
+            downloader.exchange.base = self.config.api_base
+        
+        options = dict(
+            symbol=self.config.symbol,
+            interval=self.config.interval,
+            limit=self.config.limit,
+            archive_dir=self.config.archive_dir,
+            store_dir=self.config.store_dir,
+            validate=self.config.validate_data
+        )
+        
+        if not self.config.cassette_path:
+            return downloader.download_data(**options)
+        
+        print(f"📼 Cassette ({self.config.cassette_mode}): {self.config.cassette_path}")
+        with Cassette(self.config.cassette_path, self.config.cassette_mode) as cassette:
+            downloader.exchange.cassette = cassette
+            try:
+                return downloader.download_data(**options)
+            finally:
+                downloader.exchange.cassette = None
+    
+    def _save_results(self, df, key=None):
         """Save processed data to organized directory structure"""
         import os
         
@@ -66,19 +129,104 @@ class TradingPipeline:
         os.makedirs(self.config.output_dir, exist_ok=True)
         os.makedirs(self.config.raw_dir, exist_ok=True)
         
-        # Generate automatic filename
-        filename = self.config.get_output_filename()
+        # Generate automatic filename (named after the request key, so reruns overwrite)
+        filename = self.config.get_output_filename(key)
         output_path = os.path.join(self.config.output_dir, filename)
         
-        # Save processed data
-        df.to_csv(output_path, index=False)
+        # Save processed data (streamed row groups, typed columns)
+        get_writer(self.config.output_format).write(df, output_path)
         print(f"💾 Data saved to: {output_path}")
         
-        # Also save a copy in exports for Label Studio
+        return output_path
+    
+    def _export_latest(self, df, output_path):
+        """Point latest_dataset at output_path and write the Label Studio and visualizer copies"""
+        os.makedirs(self.config.exports_dir, exist_ok=True)
+        
+        # "latest" pointer: atomic link to the processed dataset, not another copy
+        # (latest_dataset.csv is always the Label Studio export below)
+        extension = os.path.splitext(output_path)[1]
+        if extension != '.csv':
+            latest_path = link_latest(output_path, os.path.join(self.config.exports_dir, f"latest_dataset{extension}"))
+            print(f"🔗 Latest dataset: {latest_path} -> {output_path}")
+        
+        # Links of other formats would point at an older dataset than the copies below
+        for writer in WRITERS.values():
+            stale = os.path.join(self.config.exports_dir, f"latest_dataset{writer.extension}")
+            if writer.extension not in ('.csv', extension) and os.path.lexists(stale):
+                os.remove(stale)
+        
+        # CSV only for Label Studio (the only place dates are formatted)
         exports_path = os.path.join(self.config.exports_dir, "latest_dataset.csv")
-        df.to_csv(exports_path, index=False)
+        write_label_studio_csv(df, exports_path)
         print(f"📤 Export copy for Label Studio: {exports_path}")
         
+        # Binary copy for the visualizers (memory-mapped, no text parsing)
+        candles_path = os.path.join(self.config.exports_dir, "latest_dataset.candles")
+        write_candles(candles_path, df, self.config.symbol, self.config.interval)
+        print(f"📤 Binary copy for visualizers: {candles_path}")
+    
+    def _exported(self, output_path):
+        """Whether the latest_dataset link and copies were already made from output_path"""
+        extension = os.path.splitext(output_path)[1]
+        if extension == '.csv':
+            return False
+        
+        exports = [os.path.join(self.config.exports_dir, f"latest_dataset{ext}") for ext in ('.csv', '.candles')]
+        link = os.path.join(self.config.exports_dir, f"latest_dataset{extension}")
+        return (os.path.islink(link) and os.path.realpath(link) == os.path.realpath(output_path)
+                and all(os.path.exists(path) for path in exports))
+    
+    def _catalog(self):
+        """
+        Dataset catalog, unless disabled or a cassette is in use: replayed data
+        is not 'now', and a recording must download instead of hitting the catalog
+        """
+        if not self.config.catalog_path or self.config.cassette_path:
+            return None
+        return DatasetCatalog(self.config.catalog_path)
+    
+    def _request_fields(self):
+        """
+        Everything that determines the output of this run (hashed into its
+        catalog key and stored in its catalog entry).
+        
+        The range is identified by the open time of the current candle, so
+        reruns within the same candle are answered from the catalog.
+        """
+        current = Binance.CandleOpenTime(self.config.interval, Binance._now_ms())
+        return dict(
+            symbol=self.config.symbol,
+            interval=self.config.interval,
+            limit=self.config.limit,
+            current_candle=current,
+            source='store' if self.config.store_dir else 'archive' if self.config.archive_dir else 'rest',
+            api_base=self.config.api_base,
+            output_format=self.config.output_format,
+            higher_timeframes=self.config.higher_timeframes,
+            validate=self.config.validate_data,
+            params=dict(
+                ema_periods=self.config.ema_periods,
+                adx_period=self.config.adx_period,
+                atr_period=self.config.atr_period,
+                smi_period=self.config.smi_period
+            )
+        )
+    
+    def _record(self, catalog, key, output_path, request, df):
+        """
+        Add output_path to the catalog with the request fields and the open
+        times of its first and last candle; identical content already on disk
+        is reused instead
+        """
+        fields = dict(request, start=int(df['time'].min()), end=int(df['time'].max()))
+        entry = catalog.record(key, output_path, **fields)
+        for other in catalog.find_content(entry['content_hash']):
+            if other['path'] != output_path and os.path.exists(other['path']):
+                os.remove(output_path)
+                catalog.record(key, other['path'], content_hash=entry['content_hash'], **fields)
+                print(f"♻️  Identical dataset already stored: {other['path']}")
+                return other['path']
         return output_path
     
     def _print_summary(self, df, output_path):
@@ -86,7 +234,7 @@ class TradingPipeline:
         print("\n📊 PIPELINE SUMMARY:")
         print(f"   • Dataset: {output_path}")
         print(f"   • Total candles: {len(df)}")
-        print(f"   • Date range: {df['date'].min()} to {df['date'].max()}")
+        print(f"   • Date range: {pd.Timestamp(df['time'].min(), unit='ms')} to {pd.Timestamp(df['time'].max(), unit='ms')}")
         print(f"   • ADX > 25 (Strong trend): {(df['adx'] > 25).sum()}")
         print(f"   • Indicators calculated: EMA{self.config.ema_periods}, ADX, ATR, SMI")
 
@@ -97,9 +245,18 @@ def main():
     parser = argparse.ArgumentParser(description='Trading Data Pipeline')
     parser.add_argument('--symbol', default='BTCUSDT', help='Trading symbol (default: BTCUSDT)')
     parser.add_argument('--interval', default='4h', help='Time interval (default: 4h)')
+    parser.add_argument('--higher-timeframes', help='Coarser intervals to resample and join, e.g. 4h,1d')
     parser.add_argument('--limit', type=int, default=1000, help='Number of candles (default: 1000)')
     parser.add_argument('--output-dir', default='data/processed', help='Output directory (default: data/processed)')
+    parser.add_argument('--output-format', choices=['parquet', 'feather', 'csv'], help='Processed dataset format (default: parquet)')
     parser.add_argument('--config-file', help='JSON configuration file')
+    parser.add_argument('--archive-dir', help='Directory of Binance kline zip archives to load history from')
+    parser.add_argument('--store-dir', help='Parquet candle store to sync and read from (e.g. data/candles)')
+    parser.add_argument('--no-catalog', action='store_true', help='Always recompute, without reading or updating the dataset catalog')
+    parser.add_argument('--no-validate', action='store_true', help='Skip the duplicate/gap check and backfill of downloaded candles')
+    parser.add_argument('--api-base', help='Exchange REST root URL (e.g. a local_binance_server.py instance)')
+    parser.add_argument('--record-cassette', metavar='PATH', help='Record exchange responses to PATH')
+    parser.add_argument('--replay-cassette', metavar='PATH', help='Replay exchange responses from PATH (offline)')
     
     args = parser.parse_args()
     
@@ -116,6 +273,32 @@ def main():
             output_dir=args.output_dir
         )
     
+    if args.higher_timeframes:
+        config.higher_timeframes = args.higher_timeframes.split(',')
+    
+    if args.output_format:
+        config.output_format = args.output_format
+    
+    if args.archive_dir:
+        config.archive_dir = args.archive_dir
+    
+    if args.store_dir:
+        config.store_dir = args.store_dir
+    
+    if args.no_catalog:
+        config.catalog_path = None
+    
+    if args.no_validate:
+        config.validate_data = False
+    
+    if args.api_base:
+        config.api_base = args.api_base
+    
+    if args.record_cassette:
+        config.cassette_path, config.cassette_mode = args.record_cassette, 'record'
+    elif args.replay_cassette:
+        config.cassette_path, config.cassette_mode = args.replay_cassette, 'replay'
+    
     # Run pipeline
     pipeline = TradingPipeline(config)
     pipeline.run_pipeline()